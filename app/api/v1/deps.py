@@ -1,6 +1,8 @@
 from fastapi import HTTPException, Header
 
+from app.core.admission import admission_controller, AdmissionController
 from app.core.config import settings
+from app.core.deadline import Deadline
 from app.services.ocr_service import ocr_service, OCRService
 
 
@@ -8,6 +10,18 @@ def get_ocr_service() -> OCRService:
     return ocr_service
 
 
+def get_admission_controller() -> AdmissionController:
+    return admission_controller
+
+
+def get_deadline() -> Deadline:
+    return Deadline(settings.REQUEST_TIMEOUT)
+
+
+def get_client_key(x_api_key: str | None = Header(None)) -> str | None:
+    return x_api_key
+
+
 async def verify_api_key(x_api_key: str | None = Header(None)) -> None:
     if settings.API_KEY is None:
         return
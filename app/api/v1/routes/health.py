@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 from app.api.v1.schemas.responses import HealthResponse
+from app.core.admission import admission_controller
 from app.engines.registry import EngineRegistry
 
 router = APIRouter(tags=["Health"])
@@ -12,8 +13,12 @@ async def health():
 
 
 @router.get("/ready", response_model=HealthResponse)
-async def ready():
-    initialized = EngineRegistry.list_initialized()
-    if not initialized:
+async def ready(response: Response):
+    ready_engines = EngineRegistry.list_ready()
+    if not ready_engines:
+        response.status_code = 503
         return HealthResponse(status="not_ready", engines=[])
-    return HealthResponse(status="ready", engines=initialized)
+    if admission_controller.saturated:
+        response.status_code = 503
+        return HealthResponse(status="saturated", engines=ready_engines)
+    return HealthResponse(status="ready", engines=ready_engines)
@@ -1,117 +1,227 @@
+import asyncio
 import base64
 import json
 import time
+from typing import Awaitable, TypeVar
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, Request, UploadFile, File, Form, HTTPException
 
-from app.api.v1.deps import get_ocr_service, verify_api_key
-from app.api.v1.schemas.requests import OCRRequest, BatchOCRRequest, JSONLItem
-from app.api.v1.schemas.responses import OCRResponse, BatchOCRResponse, BatchItemResult, JSONLBatchResponse, JSONLItemResult
+from app.api.v1.deps import get_ocr_service, get_admission_controller, get_client_key, get_deadline, verify_api_key
+from app.api.v1.serialization import batch_response
+from app.api.v1.schemas.requests import OCRRequest, BatchOCRRequest, JSONLItem, LayoutRequest, RegionOCRRequest
+from app.api.v1.schemas.responses import OCRResponse, BatchOCRResponse, JSONLBatchResponse, BatchJobResponse, LayoutResponse, LayoutRegionResult, RegionOCRResponse, RegionResult
 from app.services.ocr_service import OCRService
+from app.core.admission import AdmissionController
 from app.engines.base import OutputFormat
-from app.engines.registry import EngineRegistry
 from app.core.config import settings
+from app.core.deadline import Deadline
 from app.core.exceptions import OCRException
 
 router = APIRouter(prefix="/ocr", tags=["OCR"], dependencies=[Depends(verify_api_key)])
 
 MAX_JSONL_ITEMS = 100
+DISCONNECT_POLL_INTERVAL = 1.0
 
+T = TypeVar("T")
 
-@router.post("", response_model=OCRResponse)
-async def process_image(request: OCRRequest, service: OCRService = Depends(get_ocr_service)):
+
+def _read_jsonl_lines(content: bytes, max_items: int) -> list[tuple[int, str]]:
+    lines = content.decode("utf-8").strip().split("\n")
+
+    if len(lines) > max_items:
+        raise HTTPException(status_code=400, detail=f"Max {max_items} items per request")
+
+    numbered = [(i, line) for i, line in enumerate(lines) if line.strip()]
+    if not numbered:
+        raise HTTPException(status_code=400, detail="No valid items in JSONL file")
+    return numbered
+
+
+def _parse_jsonl_line(i: int, line: str) -> tuple[str, str]:
     try:
-        result, engine_name, elapsed_ms = await service.process_image(request.image, request.engine, request.format)
-        print(f"[OCR] Single image processed: engine={engine_name}, time={elapsed_ms}ms")
-        return OCRResponse(content=result.content, format=result.format, engine=engine_name, processing_time_ms=elapsed_ms)
-    except OCRException as e:
-        raise HTTPException(status_code=400, detail=e.message)
+        parsed = JSONLItem.model_validate(json.loads(line))
+        base64.b64decode(parsed.image, validate=True)
+        return parsed.id or str(i), parsed.image
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSONL at line {i + 1}: {e}")
 
 
-@router.post("/upload", response_model=OCRResponse)
-async def process_image_upload(file: UploadFile = File(...), engine: str | None = Form(None), format: OutputFormat = Form("markdown"), service: OCRService = Depends(get_ocr_service)):
+def _decode_jsonl_line(i: int, line: str) -> tuple[str, bytes]:
     try:
-        image_bytes = await file.read()
-        image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+        parsed = JSONLItem.model_validate(json.loads(line))
+        return parsed.id or str(i), base64.b64decode(parsed.image)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSONL at line {i + 1}: {e}")
 
-        result, engine_name, elapsed_ms = await service.process_image(image_b64, engine, format)
-        print(f"[OCR] Upload processed: engine={engine_name}, time={elapsed_ms}ms")
-        return OCRResponse(content=result.content, format=result.format, engine=engine_name, processing_time_ms=elapsed_ms)
-    except OCRException as e:
-        raise HTTPException(status_code=400, detail=e.message)
 
+def _jsonl_items(results) -> list[dict]:
+    items = []
+    for id_, result in results:
+        if isinstance(result, Exception):
+            items.append({"id": id_, "content": None, "success": False, "error": str(result)})
+        else:
+            items.append({"id": id_, "content": result.content, "success": True, "error": None})
+    return items
 
-@router.post("/batch", response_model=BatchOCRResponse)
-async def process_batch(request: BatchOCRRequest, service: OCRService = Depends(get_ocr_service)):
+
+async def _cancel_on_disconnect(http_request: Request, work: Awaitable[T]) -> T:
+    task = asyncio.ensure_future(work)
     try:
-        results, engine_name, elapsed_ms = await service.process_batch(request.images, request.engine, request.format)
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                print("[OCR] Client disconnected, cancelled in-flight work")
+                raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
 
-        items = []
-        for r in results:
-            if isinstance(r, Exception):
-                items.append(BatchItemResult(success=False, error=str(r)))
-            else:
-                items.append(BatchItemResult(content=r.content, success=True))
 
-        print(f"[OCR] Batch processed: {len(items)} images, engine={engine_name}, time={elapsed_ms}ms")
-        return BatchOCRResponse(results=items, format=request.format, engine=engine_name, processing_time_ms=elapsed_ms)
-    except OCRException as e:
-        raise HTTPException(status_code=400, detail=e.message)
+@router.post("", response_model=OCRResponse)
+async def process_image(request: OCRRequest, http_request: Request, service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(request.engine or settings.DEFAULT_ENGINE, 1, client_key, deadline):
+        try:
+            result, engine_name, elapsed_ms = await _cancel_on_disconnect(http_request, service.process_image(request.image, request.engine, request.format, deadline))
+            print(f"[OCR] Single image processed: engine={engine_name}, time={elapsed_ms}ms")
+            return OCRResponse(content=result.content, format=result.format, engine=engine_name, processing_time_ms=elapsed_ms)
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
 
 
-@router.post("/batch/jsonl", response_model=JSONLBatchResponse)
-async def process_batch_jsonl(file: UploadFile = File(...), engine: str | None = Form(None)):
-    start = time.perf_counter()
+@router.post("/upload", response_model=OCRResponse)
+async def process_image_upload(http_request: Request, file: UploadFile = File(...), engine: str | None = Form(None), format: OutputFormat = Form("markdown"), service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(engine or settings.DEFAULT_ENGINE, 1, client_key, deadline):
+        try:
+            image_bytes = await file.read()
+            image_b64 = base64.b64encode(image_bytes).decode("utf-8")
 
-    content = await file.read()
-    lines = content.decode("utf-8").strip().split("\n")
+            result, engine_name, elapsed_ms = await _cancel_on_disconnect(http_request, service.process_image(image_b64, engine, format, deadline))
+            print(f"[OCR] Upload processed: engine={engine_name}, time={elapsed_ms}ms")
+            return OCRResponse(content=result.content, format=result.format, engine=engine_name, processing_time_ms=elapsed_ms)
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
 
-    if len(lines) > MAX_JSONL_ITEMS:
-        raise HTTPException(status_code=400, detail=f"Max {MAX_JSONL_ITEMS} items per request")
 
-    items: list[tuple[str | None, bytes]] = []
-    for i, line in enumerate(lines):
-        if not line.strip():
-            continue
+@router.post("/layout", response_model=LayoutResponse)
+async def analyze_layout(request: LayoutRequest, http_request: Request, service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(request.engine or settings.DEFAULT_ENGINE, 1, client_key, deadline):
         try:
-            parsed = JSONLItem.model_validate(json.loads(line))
-            image_bytes = base64.b64decode(parsed.image)
-            items.append((parsed.id or str(i), image_bytes))
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid JSONL at line {i + 1}: {e}")
+            layout, engine_name, elapsed_ms = await _cancel_on_disconnect(http_request, service.analyze_layout(request.image, request.engine, deadline))
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    print(f"[OCR] Layout analyzed: {len(layout.regions)} regions, engine={engine_name}, time={elapsed_ms}ms")
+    return LayoutResponse(
+        layout_id=layout.layout_id,
+        width=layout.width,
+        height=layout.height,
+        regions=[LayoutRegionResult(id=r.id, label=r.label, bbox=r.bbox, bbox_normalized=r.bbox_normalized, reading_order=r.reading_order, tags=r.tags) for r in layout.regions],
+        engine=engine_name,
+        processing_time_ms=elapsed_ms,
+        expires_in_s=layout.expires_in_s,
+    )
 
-    if not items:
-        raise HTTPException(status_code=400, detail="No valid items in JSONL file")
 
+@router.post("/layout/regions", response_model=RegionOCRResponse)
+async def process_layout_regions(request: RegionOCRRequest, http_request: Request, service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(request.engine or settings.DEFAULT_ENGINE, 1, client_key, deadline):
+        try:
+            result, engine_name, elapsed_ms = await _cancel_on_disconnect(http_request, service.process_regions(request.layout_id, request.region_ids, request.engine, request.format, deadline))
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    regions = [RegionResult(id=e["reading_order"], label=e["label"], bbox=e["bbox"], text=e["text"]) for e in result.metadata.get("elements", [])]
+    print(f"[OCR] Layout regions processed: {len(regions)} regions, engine={engine_name}, time={elapsed_ms}ms")
+    return RegionOCRResponse(layout_id=request.layout_id, content=result.content, format=result.format, regions=regions, engine=engine_name, processing_time_ms=elapsed_ms)
+
+
+@router.post("/batch", response_model=BatchOCRResponse)
+async def process_batch(request: BatchOCRRequest, http_request: Request, service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(request.engine or settings.DEFAULT_ENGINE, len(request.images), client_key, deadline):
+        try:
+            results, engine_name, elapsed_ms = await _cancel_on_disconnect(http_request, service.process_batch(request.images, request.engine, request.format, deadline))
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    items = []
+    for r in results:
+        if isinstance(r, Exception):
+            items.append({"content": None, "success": False, "error": str(r)})
+        else:
+            items.append({"content": r.content, "success": True, "error": None})
+
+    print(f"[OCR] Batch processed: {len(items)} images, engine={engine_name}, time={elapsed_ms}ms")
+    return await batch_response(http_request, items, {"format": request.format, "engine": engine_name, "processing_time_ms": elapsed_ms})
+
+
+@router.post("/batch/jsonl", response_model=JSONLBatchResponse)
+async def process_batch_jsonl(http_request: Request, file: UploadFile = File(...), engine: str | None = Form(None), service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    start = time.perf_counter()
+
+    lines = _read_jsonl_lines(await file.read(), MAX_JSONL_ITEMS)
     engine_name = engine or settings.DEFAULT_ENGINE
-    engine_instance = EngineRegistry.get_instance(engine_name)
 
-    images_bytes = [img for _, img in items]
-    ids = [id_ for id_, _ in items]
+    async with admission.admit(engine_name, len(lines), client_key, deadline):
+        items = [_decode_jsonl_line(i, line) for i, line in lines]
 
-    print(f"[OCR] JSONL batch started: {len(items)} items, engine={engine_name}")
-    results = await engine_instance.process_batch(images_bytes, "markdown")
+        images_bytes = [img for _, img in items]
+        ids = [id_ for id_, _ in items]
 
-    elapsed_ms = int((time.perf_counter() - start) * 1000)
+        print(f"[OCR] JSONL batch started: {len(items)} items, engine={engine_name}")
+        results, engine_name, _ = await _cancel_on_disconnect(http_request, service.process_batch_bytes(images_bytes, engine_name, "markdown", deadline))
 
-    response_items = []
-    succeeded = 0
-    failed = 0
+    elapsed_ms = int((time.perf_counter() - start) * 1000)
 
-    for id_, result in zip(ids, results):
-        if isinstance(result, Exception):
-            response_items.append(JSONLItemResult(id=id_, success=False, error=str(result)))
-            failed += 1
-        else:
-            response_items.append(JSONLItemResult(id=id_, content=result.content, success=True))
-            succeeded += 1
+    response_items = _jsonl_items(zip(ids, results))
+    succeeded = sum(1 for item in response_items if item["success"])
 
     print(f"[OCR] JSONL batch complete: {succeeded}/{len(items)} succeeded, time={elapsed_ms}ms")
-    return JSONLBatchResponse(
-        results=response_items,
-        engine=engine_name,
-        processing_time_ms=elapsed_ms,
-        total=len(items),
-        succeeded=succeeded,
-        failed=failed,
-    )
+    return await batch_response(http_request, response_items, {
+        "engine": engine_name,
+        "processing_time_ms": elapsed_ms,
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+    })
+
+
+@router.post("/batch/jsonl/offline", response_model=BatchJobResponse)
+async def submit_batch_job(file: UploadFile = File(...), engine: str | None = Form(None), service: OCRService = Depends(get_ocr_service), admission: AdmissionController = Depends(get_admission_controller), client_key: str | None = Depends(get_client_key), deadline: Deadline = Depends(get_deadline)):
+    async with admission.admit(engine or settings.DEFAULT_ENGINE, 1, client_key, deadline):
+        lines = _read_jsonl_lines(await file.read(), settings.GEMINI_BATCH_MAX_ITEMS)
+        items = [_parse_jsonl_line(i, line) for i, line in lines]
+        del lines
+
+        try:
+            status, engine_name = await deadline.wait(service.submit_batch_job(items, engine))
+        except OCRException as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    print(f"[OCR] Offline batch submitted: {len(items)} items, job={status.job_id}, engine={engine_name}")
+    return BatchJobResponse(job_id=status.job_id, state=status.state, done=status.done, engine=engine_name, total=len(items))
+
+
+@router.get("/batch/jobs/{job_id:path}", response_model=BatchJobResponse)
+async def get_batch_job(job_id: str, http_request: Request, engine: str | None = None, service: OCRService = Depends(get_ocr_service)):
+    try:
+        status, engine_name = await service.get_batch_job(job_id, engine)
+    except OCRException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    if status.results is None:
+        return BatchJobResponse(job_id=status.job_id, state=status.state, done=status.done, engine=engine_name)
+
+    results = _jsonl_items(status.results)
+    succeeded = sum(1 for r in results if r["success"])
+    return await batch_response(http_request, results, {
+        "job_id": status.job_id,
+        "state": status.state,
+        "done": status.done,
+        "engine": engine_name,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    })
@@ -15,6 +15,18 @@ class BatchOCRRequest(BaseModel):
     format: OutputFormat = Field("markdown", description="Output format")
 
 
+class LayoutRequest(BaseModel):
+    image: str = Field(..., description="Base64 encoded image")
+    engine: str | None = Field(None, description="OCR engine to use")
+
+
+class RegionOCRRequest(BaseModel):
+    layout_id: str = Field(..., description="Layout id returned by /ocr/layout")
+    region_ids: list[int] = Field(..., description="Region ids to recognize", min_length=1)
+    engine: str | None = Field(None, description="OCR engine to use")
+    format: OutputFormat = Field("markdown", description="Output format")
+
+
 class JSONLItem(BaseModel):
     image: str = Field(..., description="Base64 encoded image")
     id: str | None = Field(None, description="Optional identifier for tracking")
@@ -39,6 +39,52 @@ class JSONLBatchResponse(BaseModel):
     failed: int
 
 
+class BatchJobResponse(BaseModel):
+    job_id: str
+    state: str
+    done: bool
+    engine: str
+    total: int | None = None
+    succeeded: int | None = None
+    failed: int | None = None
+    results: list[JSONLItemResult] | None = None
+
+
+class LayoutRegionResult(BaseModel):
+    id: int
+    label: str
+    bbox: list[int]
+    bbox_normalized: list[int]
+    reading_order: int
+    tags: list[str] = Field(default_factory=list)
+
+
+class LayoutResponse(BaseModel):
+    layout_id: str
+    width: int
+    height: int
+    regions: list[LayoutRegionResult]
+    engine: str
+    processing_time_ms: int
+    expires_in_s: int
+
+
+class RegionResult(BaseModel):
+    id: int
+    label: str
+    bbox: list[int]
+    text: str
+
+
+class RegionOCRResponse(BaseModel):
+    layout_id: str
+    content: str
+    format: OutputFormat
+    regions: list[RegionResult]
+    engine: str
+    processing_time_ms: int
+
+
 class HealthResponse(BaseModel):
     status: str
     engines: list[str] = Field(default_factory=list)
@@ -0,0 +1,75 @@
+import asyncio
+import gzip
+import json
+import time
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_items(items: list[dict]) -> list[bytes]:
+    return [dumps(item) for item in items]
+
+
+def build_body(encoded_items: list[bytes], envelope: dict) -> bytes:
+    head = dumps(envelope)
+    if head == b"{}":
+        return b'{"results":[' + b",".join(encoded_items) + b"]}"
+    return b'{"results":[' + b",".join(encoded_items) + b"]," + head[1:]
+
+
+def _quality(params: list[str]) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_gzip(request: Request) -> bool:
+    qualities = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = part.split(";")
+        if coding.strip():
+            qualities[coding.strip().lower()] = _quality(params)
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _render(items: list[dict], envelope: dict, compress: bool) -> tuple[bytes, bool]:
+    body = build_body(encode_items(items), envelope)
+    if compress and len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return gzip.compress(body, compresslevel=settings.RESPONSE_COMPRESSION_LEVEL), True
+    return body, False
+
+
+async def batch_response(request: Request, items: list[dict], envelope: dict) -> Response:
+    compress = settings.RESPONSE_COMPRESSION and accepts_gzip(request)
+
+    start = time.perf_counter()
+    body, compressed = await asyncio.to_thread(_render, items, envelope, compress)
+    serialize_ms = (time.perf_counter() - start) * 1000
+
+    headers = {"Vary": "Accept-Encoding", "Server-Timing": f"serialize;dur={serialize_ms:.1f}"}
+    if "processing_time_ms" in envelope:
+        headers["Server-Timing"] = f"engine;dur={envelope['processing_time_ms']}, " + headers["Server-Timing"]
+    if compressed:
+        headers["Content-Encoding"] = "gzip"
+
+    print(f"[OCR] Serialized {len(items)} results: {len(body)} bytes{' (gzip)' if compressed else ''} in {serialize_ms:.1f}ms")
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.engines.registry import EngineRegistry
+from app.services.ocr_service import OCRService
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp", ".gif"}
+CHECKPOINT_NAME = ".checkpoint.jsonl"
+DEFAULT_TIMEOUT = 3600.0
+
+
+@dataclass
+class Item:
+    id: str
+    path: Path
+
+
+def _safe_id(id_: str) -> str:
+    parts = PurePosixPath(id_.replace("\\", "/")).parts
+    if not parts or parts[0] == "/" or ".." in parts:
+        raise ValueError(f"Invalid item id '{id_}'")
+    return "/".join(parts)
+
+
+def scan_directory(root: Path) -> list[Item]:
+    files = sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+    return [Item(p.relative_to(root).with_suffix("").as_posix(), p) for p in files]
+
+
+def read_manifest(manifest: Path) -> list[Item]:
+    items = []
+    for line_no, line in enumerate(manifest.read_text().splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if manifest.suffix == ".jsonl":
+            entry = json.loads(line)
+            path = Path(entry["path"])
+            id_ = entry.get("id")
+        else:
+            path, id_ = Path(line), None
+        path = path if path.is_absolute() else manifest.parent / path
+        items.append(Item(id_ or path.with_suffix("").name, path))
+    return items
+
+
+def load_items(source: Path) -> list[Item]:
+    items = scan_directory(source) if source.is_dir() else read_manifest(source)
+    seen = set()
+    for item in items:
+        item.id = _safe_id(item.id)
+        if item.id in seen:
+            raise ValueError(f"Duplicate item id '{item.id}'")
+        seen.add(item.id)
+    return items
+
+
+def load_checkpoint(path: Path, retry_failed: bool) -> set[str]:
+    if not path.exists():
+        return set()
+
+    status: dict[str, bool] = {}
+    for line in path.read_text().splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        status[entry["id"]] = entry["success"]
+    return {id_ for id_, ok in status.items() if ok or not retry_failed}
+
+
+class ResultWriter:
+    def __init__(self, output: Path, output_format: str, checkpoint: Path):
+        self.output = output
+        self.output_format = output_format
+        output.mkdir(parents=True, exist_ok=True)
+        self._checkpoint = checkpoint.open("a")
+        self._jsonl = (output / "results.jsonl").open("a") if output_format == "jsonl" else None
+
+    def write(self, item: Item, content: str | None, error: str | None, elapsed_ms: int) -> None:
+        if content is not None and self._jsonl is not None:
+            record = {"id": item.id, "path": str(item.path), "content": content, "processing_time_ms": elapsed_ms}
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+        elif content is not None:
+            target = self.output / f"{item.id}.md"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content)
+
+        self._checkpoint.write(json.dumps({"id": item.id, "success": error is None, "error": error}) + "\n")
+        self._checkpoint.flush()
+
+    def close(self) -> None:
+        self._checkpoint.close()
+        if self._jsonl is not None:
+            self._jsonl.close()
+
+
+async def run(items: list[Item], writer: ResultWriter, engine_name: str, concurrency: int, timeout: float) -> tuple[int, int]:
+    service = OCRService()
+    queue: asyncio.Queue[Item | None] = asyncio.Queue(maxsize=concurrency * 2)
+    done = failed = 0
+
+    async def worker() -> None:
+        nonlocal done, failed
+        while (item := await queue.get()) is not None:
+            start = time.perf_counter()
+            try:
+                image_bytes = await asyncio.to_thread(item.path.read_bytes)
+                result, _, elapsed_ms = await service.process_image_bytes(image_bytes, engine_name, deadline=Deadline(timeout))
+                content, error = result.content, None
+            except Exception as e:
+                content, error = None, str(e) or type(e).__name__
+                elapsed_ms = int((time.perf_counter() - start) * 1000)
+                failed += 1
+
+            writer.write(item, content, error, elapsed_ms)
+            done += 1
+            print(f"[CLI] {done}/{len(items)} {item.id}: {'ok' if error is None else f'failed ({error})'} in {elapsed_ms}ms")
+
+    async def feed() -> None:
+        for item in items:
+            await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    await asyncio.gather(feed(), *(worker() for _ in range(concurrency)))
+    return done, failed
+
+
+async def main_async(args) -> None:
+    output = Path(args.output)
+    checkpoint = Path(args.checkpoint) if args.checkpoint else output / CHECKPOINT_NAME
+    engine_name = args.engine or settings.DEFAULT_ENGINE
+
+    items = load_items(Path(args.input))
+    completed = load_checkpoint(checkpoint, args.retry_failed)
+    pending = [item for item in items if item.id not in completed]
+    print(f"[CLI] {len(items)} items, {len(items) - len(pending)} already done, {len(pending)} to process with engine={engine_name}")
+    if not pending:
+        return
+
+    await EngineRegistry.initialize_engine(engine_name)
+    writer = ResultWriter(output, args.format, checkpoint)
+    start = time.perf_counter()
+    try:
+        done, failed = await run(pending, writer, engine_name, args.concurrency, args.timeout)
+    finally:
+        writer.close()
+        await EngineRegistry.cleanup_all()
+
+    elapsed = time.perf_counter() - start
+    print(f"[CLI] Finished: {done - failed}/{done} succeeded in {elapsed:.1f}s ({done / elapsed:.2f} pages/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OCR a directory or manifest of images in-process, with resumable checkpoints")
+    parser.add_argument("input", help="Directory of images (scanned recursively) or manifest (.txt with one path per line, or .jsonl with path/id)")
+    parser.add_argument("output", help="Output directory")
+    parser.add_argument("--engine", help=f"Engine to use (default: {settings.DEFAULT_ENGINE})")
+    parser.add_argument("--format", choices=["markdown", "jsonl"], default="markdown", help="One .md file per item mirroring the input tree, or a single results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pages processed concurrently")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Seconds allowed per page, including time queued behind other pages (default: {DEFAULT_TIMEOUT:.0f})")
+    parser.add_argument("--checkpoint", help=f"Checkpoint file (default: OUTPUT/{CHECKPOINT_NAME})")
+    parser.add_argument("--retry-failed", action="store_true", help="Reprocess items that failed in a previous run")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.timeout <= 0:
+        parser.error("--timeout must be positive")
+
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        print("[CLI] Interrupted, rerun the same command to resume")
+
+
+if __name__ == "__main__":
+    main()
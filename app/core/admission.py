@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import OverloadedError
+
+DRAIN_WINDOW_SECONDS = 60.0
+DEFAULT_RETRY_AFTER = 5
+MAX_RETRY_AFTER = 120
+
+
+class AdmissionPool:
+    def __init__(self, name: str, max_inflight_cost: float, max_queued_pages: int):
+        self.name = name
+        self.max_inflight_cost = max_inflight_cost
+        self.max_queued_pages = max_queued_pages
+        self.inflight_cost = 0.0
+        self.inflight_pages = 0
+        self.queued_pages = 0
+        self._waiters: deque[tuple[float, int, asyncio.Future]] = deque()
+        self._completions: deque[tuple[float, int]] = deque()
+
+    @property
+    def idle(self) -> bool:
+        return self.inflight_pages == 0 and not self._waiters
+
+    def drain_rate(self) -> float:
+        now = time.monotonic()
+        while self._completions and now - self._completions[0][0] > DRAIN_WINDOW_SECONDS:
+            self._completions.popleft()
+        if not self._completions:
+            return 0.0
+        span = max(now - self._completions[0][0], 1.0)
+        return sum(pages for _, pages in self._completions) / span
+
+    def retry_after(self, pages: int) -> int:
+        rate = self.drain_rate()
+        if rate <= 0:
+            return DEFAULT_RETRY_AFTER
+        return max(1, min(MAX_RETRY_AFTER, math.ceil((self.queued_pages + pages) / rate)))
+
+    async def acquire(self, cost: float, pages: int) -> float:
+        cost = min(cost, self.max_inflight_cost)
+
+        if not self._waiters and self.inflight_cost + cost <= self.max_inflight_cost:
+            self._reserve(cost, pages)
+            return cost
+
+        if self.queued_pages + pages > self.max_queued_pages:
+            raise OverloadedError(self.name, self.retry_after(pages))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, pages, future)
+        self._waiters.append(entry)
+        self.queued_pages += pages
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(cost, pages, completed=False)
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                self.queued_pages -= pages
+            raise
+        return cost
+
+    def release(self, cost: float, pages: int, completed: bool = True) -> None:
+        self.inflight_cost = max(0.0, self.inflight_cost - cost)
+        self.inflight_pages -= pages
+        if completed:
+            self._completions.append((time.monotonic(), pages))
+        self._wake()
+
+    def _reserve(self, cost: float, pages: int) -> None:
+        self.inflight_cost += cost
+        self.inflight_pages += pages
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight_cost + self._waiters[0][0] <= self.max_inflight_cost:
+            cost, pages, future = self._waiters.popleft()
+            self.queued_pages -= pages
+            if future.done():
+                continue
+            self._reserve(cost, pages)
+            future.set_result(None)
+
+
+class AdmissionController:
+    def __init__(self):
+        self.enabled = settings.ADMISSION_ENABLED
+        self.pool = AdmissionPool("global", settings.ADMISSION_MAX_INFLIGHT_COST, settings.ADMISSION_MAX_QUEUED_PAGES)
+        self._key_pools: dict[str, AdmissionPool] = {}
+
+    def estimate_cost(self, engine_name: str, pages: int) -> float:
+        return settings.ADMISSION_ENGINE_COSTS.get(engine_name, 1.0) * pages
+
+    @property
+    def saturated(self) -> bool:
+        if not self.enabled or settings.ADMISSION_NOT_READY_QUEUE_FRACTION <= 0:
+            return False
+        return self.pool.queued_pages >= self.pool.max_queued_pages * settings.ADMISSION_NOT_READY_QUEUE_FRACTION
+
+    def _key_pool(self, client_key: str | None) -> AdmissionPool | None:
+        if settings.ADMISSION_PER_KEY_MAX_INFLIGHT_COST is None:
+            return None
+        key = client_key or "anonymous"
+        if key not in self._key_pools:
+            max_queued = settings.ADMISSION_PER_KEY_MAX_QUEUED_PAGES or settings.ADMISSION_MAX_QUEUED_PAGES
+            self._key_pools[key] = AdmissionPool(f"key:{key[:8]}", settings.ADMISSION_PER_KEY_MAX_INFLIGHT_COST, max_queued)
+        return self._key_pools[key]
+
+    @asynccontextmanager
+    async def admit(self, engine_name: str, pages: int, client_key: str | None = None, deadline: Deadline | None = None) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        cost = self.estimate_cost(engine_name, pages)
+        key = client_key or "anonymous"
+        key_pool = self._key_pool(client_key)
+        held: list[tuple[AdmissionPool, float]] = []
+        try:
+            if key_pool is not None:
+                held.append((key_pool, await self._acquire(key_pool, cost, pages, deadline)))
+            held.append((self.pool, await self._acquire(self.pool, cost, pages, deadline)))
+        except BaseException:
+            for pool, reserved in held:
+                pool.release(reserved, pages, completed=False)
+            self._prune(key, key_pool)
+            raise
+
+        try:
+            yield
+        finally:
+            for pool, reserved in held:
+                pool.release(reserved, pages)
+            self._prune(key, key_pool)
+
+    async def _acquire(self, pool: AdmissionPool, cost: float, pages: int, deadline: Deadline | None) -> float:
+        if deadline is None:
+            return await pool.acquire(cost, pages)
+        return await deadline.wait(pool.acquire(cost, pages))
+
+    def _prune(self, key: str, key_pool: AdmissionPool | None) -> None:
+        if key_pool is not None and key_pool.idle:
+            self._key_pools.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "inflight_pages": self.pool.inflight_pages,
+            "inflight_cost": round(self.pool.inflight_cost, 2),
+            "queued_pages": self.pool.queued_pages,
+            "drain_rate": round(self.pool.drain_rate(), 2),
+        }
+
+
+admission_controller = AdmissionController()
@@ -1,11 +1,20 @@
+import io
 from typing import List, Any, AsyncGenerator
 
-from tenacity import retry, stop_after_attempt, wait_exponential
+import httpx
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 from google import genai
 from google.genai import types as genai_types
 
 from app.core.config import settings
 
+CONNECT_ERRORS: tuple[type[Exception], ...] = (httpx.ConnectError,)
+try:
+    import aiohttp
+    CONNECT_ERRORS += (aiohttp.ClientConnectorError,)
+except ImportError:
+    pass
+
 
 class AIService:
     _instance = None
@@ -13,12 +22,20 @@ class AIService:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(AIService, cls).__new__(cls)
-            cls._instance.client = None
-            if settings.GOOGLE_API_KEY:
-                print("[AIService] Initializing with Google API key")
-                cls._instance.client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+            cls._instance._client = None
         return cls._instance
 
+    @property
+    def client(self) -> genai.Client | None:
+        if self._client is None and settings.GOOGLE_API_KEY:
+            print("[AIService] Initializing with Google API key")
+            self._client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+        return self._client
+
+    @client.setter
+    def client(self, value: genai.Client | None) -> None:
+        self._client = value
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     async def generate_content(self, model_name: str, contents: List[Any], config: genai_types.GenerateContentConfig) -> genai_types.GenerateContentResponse:
         if not self.client:
@@ -36,5 +53,33 @@ class AIService:
         async for chunk in response_stream:
             yield chunk
 
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10), retry=retry_if_exception_type(CONNECT_ERRORS))
+    async def upload_file(self, data: bytes, mime_type: str, display_name: str) -> genai_types.File:
+        if not self.client:
+            raise RuntimeError("Google API key not configured")
+        print(f"[AIService] Uploading file {display_name} ({len(data)} bytes)")
+        config = genai_types.UploadFileConfig(mime_type=mime_type, display_name=display_name)
+        return await self.client.aio.files.upload(file=io.BytesIO(data), config=config)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def download_file(self, name: str) -> bytes:
+        if not self.client:
+            raise RuntimeError("Google API key not configured")
+        print(f"[AIService] Downloading file {name}")
+        return await self.client.aio.files.download(file=name)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10), retry=retry_if_exception_type(CONNECT_ERRORS))
+    async def create_batch_job(self, model_name: str, src_file: str, display_name: str) -> genai_types.BatchJob:
+        if not self.client:
+            raise RuntimeError("Google API key not configured")
+        print(f"[AIService] Creating batch job {display_name} with model: {model_name}")
+        return await self.client.aio.batches.create(model=model_name, src=src_file, config={"display_name": display_name})
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    async def get_batch_job(self, name: str) -> genai_types.BatchJob:
+        if not self.client:
+            raise RuntimeError("Google API key not configured")
+        return await self.client.aio.batches.get(name=name)
+
 
 ai_service = AIService()
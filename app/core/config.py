@@ -1,4 +1,5 @@
 from typing import Literal
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,16 +10,51 @@ class Settings(BaseSettings):
     DEFAULT_ENGINE: str = "dolphin"
     API_KEY: str | None = None
     REQUEST_TIMEOUT: int = 300
+    WARMUP_ON_STARTUP: bool = True
+    WARMUP_RETRY_INTERVAL: float = 10.0
+
+    # Responses
+    RESPONSE_COMPRESSION: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 16384
+    RESPONSE_COMPRESSION_LEVEL: int = 5
+
+    # Admission control
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_INFLIGHT_COST: float = 8.0
+    ADMISSION_MAX_QUEUED_PAGES: int = 200
+    ADMISSION_ENGINE_COSTS: dict[str, float] = {"dolphin": 1.0, "gemini": 0.1}
+    ADMISSION_PER_KEY_MAX_INFLIGHT_COST: float | None = None
+    ADMISSION_PER_KEY_MAX_QUEUED_PAGES: int | None = None
+    ADMISSION_NOT_READY_QUEUE_FRACTION: float = 0.5
 
     # Dolphin engine
-    DOLPHIN_BACKEND: Literal["transformers", "vllm"] = "transformers"
+    DOLPHIN_BACKEND: Literal["transformers", "vllm", "shared"] = "transformers"
     DOLPHIN_MODEL: str = "ByteDance/Dolphin-v2"
     DOLPHIN_VLLM_URL: str = "http://localhost:8000/v1"
+    DOLPHIN_SHARED_SOCKET: str = "/tmp/ocr-dolphin.sock"
+    DOLPHIN_INFERENCE_SLOTS: int = 1
+    DOLPHIN_TORCH_THREADS_PER_SLOT: int = 0
+    DOLPHIN_LAYOUT_MAX_SIZE: int = 1024
+    DOLPHIN_ELEMENT_MAX_SIZE: int = 1024
+    DOLPHIN_ELEMENT_MIN_SIZE: int = 0
+    DOLPHIN_MERGE_REGIONS: bool = False
+    DOLPHIN_MERGE_MAX_HEIGHT: int = 250
+    DOLPHIN_MERGE_MAX_GAP: int = 20
+    DOLPHIN_MERGE_MAX_REGIONS: int = 8
+    DOLPHIN_LAYOUT_CACHE_TTL: int = 300
+    DOLPHIN_LAYOUT_CACHE_MAX_ENTRIES: int = 32
+    DOLPHIN_PIPELINE_ENABLED: bool = True
+    DOLPHIN_PIPELINE_QUEUE_SIZE: int = Field(2, ge=1)
+    DOLPHIN_PIPELINE_DECODE_WORKERS: int = Field(2, ge=1)
+    DOLPHIN_PIPELINE_LAYOUT_WORKERS: int = Field(1, ge=1)
+    DOLPHIN_PIPELINE_ELEMENT_WORKERS: int = Field(1, ge=1)
 
     # Gemini engine
     GOOGLE_API_KEY: str | None = None
     GEMINI_MODEL: str = "gemini-2.5-flash"
     GEMINI_MAX_CONCURRENT: int = 10
+    GEMINI_BATCH_MAX_ITEMS: int = 5000
+    GEMINI_BATCH_POLL_INTERVAL: int = 30
 
 
 settings = Settings()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, TypeVar
+
+from app.core.exceptions import DeadlineExceededError
+
+T = TypeVar("T")
+
+
+class Deadline:
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self._cancelled.is_set() or time.monotonic() >= self.expires_at
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceededError(self.timeout)
+
+    async def wait(self, awaitable: Awaitable[T]) -> T:
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceededError(self.timeout)
+
+        timeout = asyncio.timeout(self.remaining())
+        try:
+            async with timeout:
+                return await awaitable
+        except TimeoutError:
+            if timeout.expired():
+                raise DeadlineExceededError(self.timeout) from None
+            raise
@@ -1,4 +1,6 @@
 class OCRException(Exception):
+    status_code = 400
+
     def __init__(self, message: str, details: dict | None = None):
         self.message = message
         self.details = details or {}
@@ -18,6 +20,23 @@ class UnsupportedFormatError(OCRException):
         )
 
 
+class LayoutNotSupportedError(OCRException):
+    def __init__(self, engine: str):
+        super().__init__(f"Engine '{engine}' does not support layout analysis", {"engine": engine})
+
+
+class OfflineBatchNotSupportedError(OCRException):
+    def __init__(self, engine: str):
+        super().__init__(f"Engine '{engine}' does not support offline batch jobs", {"engine": engine})
+
+
+class LayoutNotFoundError(OCRException):
+    status_code = 404
+
+    def __init__(self, layout_id: str):
+        super().__init__(f"Layout '{layout_id}' not found or expired", {"layout_id": layout_id})
+
+
 class ImageProcessingError(OCRException):
     def __init__(self, reason: str):
         super().__init__(f"Failed to process image: {reason}")
@@ -26,3 +45,23 @@ class ImageProcessingError(OCRException):
 class VLLMConnectionError(OCRException):
     def __init__(self, url: str, reason: str):
         super().__init__(f"Failed to connect to vLLM at {url}: {reason}", {"url": url})
+
+
+class ModelServerConnectionError(OCRException):
+    def __init__(self, socket_path: str, reason: str):
+        super().__init__(f"Failed to reach model server at {socket_path}: {reason}", {"socket": socket_path})
+
+
+class OverloadedError(OCRException):
+    status_code = 429
+
+    def __init__(self, pool: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Server overloaded, retry after {retry_after}s", {"pool": pool, "retry_after": retry_after})
+
+
+class DeadlineExceededError(OCRException):
+    status_code = 504
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Request deadline of {timeout:g}s exceeded", {"timeout": timeout})
@@ -3,6 +3,9 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Literal
 
+from app.core.deadline import Deadline
+from app.core.exceptions import LayoutNotSupportedError, OfflineBatchNotSupportedError
+
 OutputFormat = Literal["markdown"]
 
 
@@ -13,6 +16,33 @@ class OCRResult:
     metadata: dict = field(default_factory=dict)
 
 
+@dataclass
+class LayoutRegion:
+    id: int
+    label: str
+    bbox: list[int]
+    bbox_normalized: list[int]
+    reading_order: int
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class LayoutResult:
+    layout_id: str
+    width: int
+    height: int
+    regions: list[LayoutRegion]
+    expires_in_s: int
+
+
+@dataclass
+class BatchJobStatus:
+    job_id: str
+    state: str
+    done: bool
+    results: list[tuple[str, OCRResult | Exception]] | None = None
+
+
 class OCREngine(ABC):
     name: str
     supported_formats: list[OutputFormat]
@@ -22,11 +52,11 @@ class OCREngine(ABC):
         pass
 
     @abstractmethod
-    async def process(self, image: bytes, output_format: OutputFormat = "markdown") -> OCRResult:
+    async def process(self, image: bytes, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> OCRResult:
         pass
 
-    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown") -> list[OCRResult | Exception]:
-        tasks = [self.process(img, output_format) for img in images]
+    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> list[OCRResult | Exception]:
+        tasks = [self.process(img, output_format, deadline) for img in images]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return results
 
@@ -34,5 +64,20 @@ class OCREngine(ABC):
     async def health_check(self) -> bool:
         pass
 
+    async def warmup(self) -> None:
+        pass
+
+    async def analyze_layout(self, image: bytes, deadline: Deadline | None = None) -> LayoutResult:
+        raise LayoutNotSupportedError(self.name)
+
+    async def process_regions(self, layout_id: str, region_ids: list[int], output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> OCRResult:
+        raise LayoutNotSupportedError(self.name)
+
+    async def submit_batch_job(self, items: list[tuple[str, str]], output_format: OutputFormat = "markdown") -> BatchJobStatus:
+        raise OfflineBatchNotSupportedError(self.name)
+
+    async def get_batch_job(self, job_id: str, output_format: OutputFormat = "markdown") -> BatchJobStatus:
+        raise OfflineBatchNotSupportedError(self.name)
+
     async def cleanup(self) -> None:
         pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from PIL import Image
 
+from app.core.deadline import Deadline
+
 
 class DolphinBackend(ABC):
     @abstractmethod
@@ -8,7 +10,7 @@ class DolphinBackend(ABC):
         pass
 
     @abstractmethod
-    async def chat(self, prompt: str, image: Image.Image) -> str:
+    async def chat(self, prompt: str, image: Image.Image, deadline: Deadline | None = None) -> str:
         pass
 
     @abstractmethod
@@ -0,0 +1,73 @@
+import asyncio
+
+from PIL import Image
+
+from app.engines.dolphin.backends.base import DolphinBackend
+from app.engines.dolphin.ipc import MAX_MESSAGE_SIZE, write_image_to_shm, send_message, read_message
+from app.core.deadline import Deadline
+from app.core.exceptions import OCRException, ModelServerConnectionError
+
+
+def _release_shm(write: asyncio.Future) -> None:
+    if not write.cancelled() and write.exception() is None:
+        shm, _ = write.result()
+        shm.close()
+        shm.unlink()
+
+
+class SharedBackend(DolphinBackend):
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.connected = False
+
+    async def initialize(self) -> None:
+        info = await self._request({"op": "ping"})
+        self.connected = True
+        print(f"[SharedBackend] Connected to model server at {self.socket_path} (model={info.get('model')}, device={info.get('device')})")
+
+    async def health_check(self) -> bool:
+        if not self.connected:
+            return False
+        try:
+            await self._request({"op": "ping"})
+            return True
+        except ModelServerConnectionError:
+            return False
+
+    async def cleanup(self) -> None:
+        self.connected = False
+
+    async def chat(self, prompt: str, image: Image.Image, deadline: Deadline | None = None) -> str:
+        write = asyncio.ensure_future(asyncio.to_thread(write_image_to_shm, image))
+        try:
+            shm, image_meta = await asyncio.shield(write)
+        except asyncio.CancelledError:
+            write.add_done_callback(_release_shm)
+            raise
+        message = {"op": "chat", "prompt": prompt, **image_meta}
+        if deadline:
+            message["timeout"] = deadline.remaining()
+        try:
+            response = await self._request(message)
+        finally:
+            shm.close()
+            shm.unlink()
+        return response["text"]
+
+    async def _request(self, message: dict) -> dict:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=MAX_MESSAGE_SIZE)
+        except OSError as e:
+            raise ModelServerConnectionError(self.socket_path, str(e))
+
+        try:
+            await send_message(writer, message)
+            response = await read_message(reader)
+        finally:
+            writer.close()
+
+        if response is None:
+            raise ModelServerConnectionError(self.socket_path, "Connection closed without response")
+        if not response.get("ok"):
+            raise OCRException(f"Model server error: {response.get('error', 'Unknown error')}")
+        return response
@@ -1,19 +1,43 @@
 import asyncio
+import os
+import threading
 import torch
 from PIL import Image
-from transformers import AutoProcessor, Qwen2_5_VLForConditionalGeneration
+from transformers import AutoProcessor, Qwen2_5_VLForConditionalGeneration, StoppingCriteria, StoppingCriteriaList
 from qwen_vl_utils import process_vision_info
 
 from app.engines.dolphin.backends.base import DolphinBackend
-from app.engines.dolphin.utils import resize_image
+from app.engines.dolphin.executor import InferenceExecutor
+from app.core.deadline import Deadline
+
+
+class StopOnCancel(StoppingCriteria):
+    def __init__(self, stop_event: threading.Event, deadline: Deadline | None):
+        self.stop_event = stop_event
+        self.deadline = deadline
+
+    def should_stop(self) -> bool:
+        return self.stop_event.is_set() or (self.deadline is not None and self.deadline.expired)
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.should_stop(), dtype=torch.bool, device=input_ids.device)
+
+    def check(self) -> None:
+        if self.stop_event.is_set():
+            raise RuntimeError("Generation cancelled")
+        if self.deadline is not None:
+            self.deadline.check()
 
 
 class TransformersBackend(DolphinBackend):
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, slots: int = 1, threads_per_slot: int = 0):
         self.model_name = model_name
+        self.slots = slots
+        self.threads_per_slot = threads_per_slot or max(1, (os.cpu_count() or 1) // slots)
         self.model = None
         self.processor = None
         self.device = None
+        self.executor: InferenceExecutor | None = None
 
     async def initialize(self) -> None:
         print(f"[TransformersBackend] Loading model {self.model_name}...")
@@ -34,12 +58,16 @@ class TransformersBackend(DolphinBackend):
             self.processor.tokenizer.padding_side = "left"
 
         await asyncio.to_thread(load_model)
-        print(f"[TransformersBackend] Model loaded on {self.device}")
+        self.executor = InferenceExecutor(self.slots, lambda: torch.set_num_threads(self.threads_per_slot), "dolphin-inference")
+        print(f"[TransformersBackend] Model loaded on {self.device}, {self.slots} inference slot(s) x {self.threads_per_slot} torch thread(s)")
 
     async def health_check(self) -> bool:
         return self.model is not None
 
     async def cleanup(self) -> None:
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
         if self.model:
             del self.model
             del self.processor
@@ -48,17 +76,25 @@ class TransformersBackend(DolphinBackend):
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
 
-    async def chat(self, prompt: str, image: Image.Image) -> str:
-        return await asyncio.to_thread(self._inference, prompt, image)
+    async def chat(self, prompt: str, image: Image.Image, deadline: Deadline | None = None) -> str:
+        stop_event = threading.Event()
+        try:
+            text, timing = await self.executor.run(self._inference, prompt, image, StopOnCancel(stop_event, deadline))
+        except asyncio.CancelledError:
+            stop_event.set()
+            raise
+
+        print(f"[TransformersBackend] Generate: wait={timing.wait_ms:.0f}ms, compute={timing.compute_ms:.0f}ms, queued={self.executor.queued}")
+        return text
 
-    def _inference(self, prompt: str, image: Image.Image) -> str:
-        resized = resize_image(image)
+    def _inference(self, prompt: str, image: Image.Image, stopping: StopOnCancel) -> str:
+        stopping.check()
 
         messages = [
             {
                 "role": "user",
                 "content": [
-                    {"type": "image", "image": resized},
+                    {"type": "image", "image": image},
                     {"type": "text", "text": prompt},
                 ],
             }
@@ -70,7 +106,9 @@ class TransformersBackend(DolphinBackend):
         inputs = self.processor(text=[text], images=image_inputs, padding=True, return_tensors="pt")
         inputs = inputs.to(self.model.device)
 
-        generated_ids = self.model.generate(**inputs, max_new_tokens=4096, do_sample=False)
+        generated_ids = self.model.generate(**inputs, max_new_tokens=4096, do_sample=False, stopping_criteria=StoppingCriteriaList([stopping]))
+        stopping.check()
+
         generated_ids_trimmed = generated_ids[0][len(inputs.input_ids[0]):]
 
         return self.processor.decode(generated_ids_trimmed, skip_special_tokens=True, clean_up_tokenization_spaces=False)
@@ -2,7 +2,8 @@ import httpx
 from PIL import Image
 
 from app.engines.dolphin.backends.base import DolphinBackend
-from app.engines.dolphin.utils import resize_image, image_to_base64
+from app.engines.dolphin.utils import image_to_base64
+from app.core.deadline import Deadline
 from app.core.exceptions import VLLMConnectionError
 
 
@@ -33,12 +34,11 @@ class VLLMBackend(DolphinBackend):
             await self.client.aclose()
             self.client = None
 
-    async def chat(self, prompt: str, image: Image.Image) -> str:
+    async def chat(self, prompt: str, image: Image.Image, deadline: Deadline | None = None) -> str:
         if not self.client:
             raise VLLMConnectionError(self.vllm_url, "Client not initialized")
 
-        resized = resize_image(image)
-        image_b64 = image_to_base64(resized)
+        image_b64 = image_to_base64(image)
 
         payload = {
             "model": self.model_name,
@@ -55,7 +55,8 @@ class VLLMBackend(DolphinBackend):
             "temperature": 0,
         }
 
-        response = await self.client.post(f"{self.vllm_url}/chat/completions", json=payload)
+        timeout = httpx.Timeout(min(self.timeout, deadline.remaining())) if deadline else httpx.USE_CLIENT_DEFAULT
+        response = await self.client.post(f"{self.vllm_url}/chat/completions", json=payload, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         try:
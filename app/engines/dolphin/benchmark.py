@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import dataclasses
+import difflib
+import json
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+from app.engines.dolphin.backends.base import DolphinBackend
+from app.engines.dolphin.engine import DolphinEngine
+from app.engines.dolphin.prompts import LAYOUT_PROMPT
+from app.engines.dolphin.utils import ResolutionPolicy, make_synthetic_page
+from app.core.deadline import Deadline
+from app.core.config import settings
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp"}
+TOKEN_PATCH = 28
+
+
+@dataclass
+class Call:
+    layout: bool
+    size: tuple[int, int]
+    ms: float
+
+
+@dataclass
+class PolicyConfig:
+    layout_max: int
+    element_max: int
+    element_min: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.layout_max}/{self.element_max}/{self.element_min}"
+
+
+@dataclass
+class ConfigReport:
+    config: str
+    pages: int
+    total_ms: float
+    layout_ms: float
+    element_ms: float
+    element_calls: float
+    layout_tokens: float
+    element_tokens: float
+    regions: float
+    layout_agreement: float
+    text_agreement: float
+
+
+class RecordingBackend(DolphinBackend):
+    def __init__(self, backend: DolphinBackend):
+        self.backend = backend
+        self.calls: list[Call] = []
+
+    async def initialize(self) -> None:
+        await self.backend.initialize()
+
+    async def health_check(self) -> bool:
+        return await self.backend.health_check()
+
+    async def cleanup(self) -> None:
+        await self.backend.cleanup()
+
+    async def chat(self, prompt: str, image: Image.Image, deadline: Deadline | None = None) -> str:
+        start = time.perf_counter()
+        try:
+            return await self.backend.chat(prompt, image, deadline)
+        finally:
+            self.calls.append(Call(prompt == LAYOUT_PROMPT, image.size, (time.perf_counter() - start) * 1000))
+
+
+def vision_tokens(size: tuple[int, int]) -> int:
+    return math.ceil(size[0] / TOKEN_PATCH) * math.ceil(size[1] / TOKEN_PATCH)
+
+
+def agreement(a, b) -> float:
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def parse_config(value: str) -> PolicyConfig:
+    try:
+        return PolicyConfig(*(int(part) for part in value.split("/")))
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"Invalid config '{value}', expected LAYOUT_MAX/ELEMENT_MAX[/ELEMENT_MIN]")
+
+
+def load_pages(paths: list[str]) -> list[tuple[str, Image.Image]]:
+    if not paths:
+        return [("synthetic", make_synthetic_page())]
+
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES) if path.is_dir() else [path])
+    return [(str(f), Image.open(f).convert("RGB")) for f in files]
+
+
+async def run_benchmark(pages: list[tuple[str, Image.Image]], configs: list[PolicyConfig], repeats: int = 1) -> list[ConfigReport]:
+    engine = DolphinEngine()
+    await engine.initialize()
+    recorder = RecordingBackend(engine.backend)
+    engine.backend = recorder
+
+    try:
+        await engine.warmup()
+        baseline: dict[str, tuple[list[str], str]] = {}
+        reports = []
+
+        for config in configs:
+            engine.layout_policy = ResolutionPolicy(config.layout_max)
+            engine.element_policy = ResolutionPolicy(config.element_max, config.element_min)
+            runs = []
+
+            for name, image in pages:
+                for _ in range(repeats):
+                    recorder.calls.clear()
+                    start = time.perf_counter()
+                    elements = await engine._process_document(image)
+                    total_ms = (time.perf_counter() - start) * 1000
+
+                    labels = [e["label"] for e in elements]
+                    content = engine._format_output(elements, "markdown")
+                    base_labels, base_content = baseline.setdefault(name, (labels, content))
+                    layout_calls = [c for c in recorder.calls if c.layout]
+                    element_calls = [c for c in recorder.calls if not c.layout]
+
+                    runs.append({
+                        "total_ms": total_ms,
+                        "layout_ms": sum(c.ms for c in layout_calls),
+                        "element_ms": sum(c.ms for c in element_calls),
+                        "element_calls": len(element_calls),
+                        "layout_tokens": sum(vision_tokens(c.size) for c in layout_calls),
+                        "element_tokens": sum(vision_tokens(c.size) for c in element_calls),
+                        "regions": len(elements),
+                        "layout_agreement": agreement(base_labels, labels),
+                        "text_agreement": agreement(base_content, content),
+                    })
+
+            mean = {key: round(statistics.fmean(r[key] for r in runs), 3) for key in runs[0]}
+            reports.append(ConfigReport(config=config.label, pages=len(pages), **mean))
+            print(f"[Benchmark] {config.label}: {mean['total_ms']:.0f}ms/page, text agreement {mean['text_agreement']:.3f}")
+
+        return reports
+    finally:
+        await engine.cleanup()
+
+
+def format_report(reports: list[ConfigReport]) -> str:
+    lines = [
+        "config = layout_max/element_max/element_min, agreement vs the first config",
+        f"{'config':<16} {'page ms':>9} {'layout ms':>10} {'elem ms':>9} {'calls':>6} {'layout tok':>11} {'elem tok':>9} {'regions':>8} {'layout agr':>11} {'text agr':>9}",
+    ]
+    for r in reports:
+        lines.append(f"{r.config:<16} {r.total_ms:>9.0f} {r.layout_ms:>10.0f} {r.element_ms:>9.0f} {r.element_calls:>6.1f} {r.layout_tokens:>11.0f} {r.element_tokens:>9.0f} {r.regions:>8.1f} {r.layout_agreement:>11.3f} {r.text_agreement:>9.3f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    current = f"{settings.DOLPHIN_LAYOUT_MAX_SIZE}/{settings.DOLPHIN_ELEMENT_MAX_SIZE}/{settings.DOLPHIN_ELEMENT_MIN_SIZE}"
+
+    parser = argparse.ArgumentParser(description="Compare Dolphin latency and output agreement across resolution settings")
+    parser.add_argument("pages", nargs="*", help="Page images or directories of images (defaults to a synthetic page)")
+    parser.add_argument("--configs", type=lambda v: [parse_config(c) for c in v.split(",")], default=[parse_config(current), parse_config("768/1024/0"), parse_config("512/1024/0")], help=f"Comma-separated LAYOUT_MAX/ELEMENT_MAX[/ELEMENT_MIN]; the first is the baseline (default: {current},768/1024/0,512/1024/0)")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per page and config")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run_benchmark(load_pages(args.pages), args.configs, args.repeats))
+    print(format_report(reports))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump([dataclasses.asdict(r) for r in reports], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
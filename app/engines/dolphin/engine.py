@@ -1,12 +1,18 @@
+import asyncio
+
 from PIL import Image
 
-from app.engines.base import OCREngine, OCRResult, OutputFormat
+from app.engines.base import OCREngine, OCRResult, OutputFormat, LayoutRegion, LayoutResult
 from app.engines.registry import EngineRegistry
 from app.engines.dolphin.backends.base import DolphinBackend
+from app.engines.dolphin.layout_cache import LayoutCache
+from app.engines.dolphin.merge import merge_regions, split_merged_text, union_bbox
+from app.engines.dolphin.pipeline import Stage, run_pipeline
 from app.engines.dolphin.prompts import LAYOUT_PROMPT, get_element_prompt
-from app.engines.dolphin.utils import bytes_to_image, parse_layout_string, process_coordinates, elements_to_markdown
+from app.engines.dolphin.utils import ResolutionPolicy, bytes_to_image, make_synthetic_page, parse_layout_string, process_coordinates, elements_to_markdown
 from app.core.config import settings
-from app.core.exceptions import ImageProcessingError
+from app.core.deadline import Deadline
+from app.core.exceptions import OCRException, ImageProcessingError, DeadlineExceededError, LayoutNotFoundError
 
 
 @EngineRegistry.register("dolphin")
@@ -16,16 +22,23 @@ class DolphinEngine(OCREngine):
 
     def __init__(self):
         self.backend: DolphinBackend | None = None
+        self._layout_cache = LayoutCache(settings.DOLPHIN_LAYOUT_CACHE_TTL, settings.DOLPHIN_LAYOUT_CACHE_MAX_ENTRIES)
+        self.layout_policy = ResolutionPolicy(settings.DOLPHIN_LAYOUT_MAX_SIZE)
+        self.element_policy = ResolutionPolicy(settings.DOLPHIN_ELEMENT_MAX_SIZE, settings.DOLPHIN_ELEMENT_MIN_SIZE)
 
     async def initialize(self) -> None:
         print(f"[DolphinEngine] Initializing with backend={settings.DOLPHIN_BACKEND}, model={settings.DOLPHIN_MODEL}")
+        print(f"[DolphinEngine] Resolution: layout max={self.layout_policy.max_size}, element max={self.element_policy.max_size} min={self.element_policy.min_size}")
 
         if settings.DOLPHIN_BACKEND == "vllm":
             from app.engines.dolphin.backends.vllm import VLLMBackend
             self.backend = VLLMBackend(settings.DOLPHIN_VLLM_URL, settings.DOLPHIN_MODEL, settings.REQUEST_TIMEOUT)
+        elif settings.DOLPHIN_BACKEND == "shared":
+            from app.engines.dolphin.backends.shared import SharedBackend
+            self.backend = SharedBackend(settings.DOLPHIN_SHARED_SOCKET)
         else:
             from app.engines.dolphin.backends.transformers import TransformersBackend
-            self.backend = TransformersBackend(settings.DOLPHIN_MODEL)
+            self.backend = TransformersBackend(settings.DOLPHIN_MODEL, settings.DOLPHIN_INFERENCE_SLOTS, settings.DOLPHIN_TORCH_THREADS_PER_SLOT)
 
         await self.backend.initialize()
         print(f"[DolphinEngine] Ready")
@@ -33,42 +46,83 @@ class DolphinEngine(OCREngine):
     async def health_check(self) -> bool:
         return self.backend is not None and await self.backend.health_check()
 
+    async def warmup(self) -> None:
+        elements = await self._process_document(make_synthetic_page())
+        print(f"[DolphinEngine] Warmup inference done: {len(elements)} elements")
+
     async def cleanup(self) -> None:
+        self._layout_cache.clear()
         if self.backend:
             await self.backend.cleanup()
             self.backend = None
 
-    async def process(self, image_bytes: bytes, output_format: OutputFormat = "markdown") -> OCRResult:
+    def _decode(self, image_bytes: bytes) -> Image.Image:
         try:
-            image = bytes_to_image(image_bytes)
+            return bytes_to_image(image_bytes)
         except Exception as e:
             raise ImageProcessingError(str(e))
 
-        elements = await self._process_document(image)
-        content = self._format_output(elements, output_format)
+    async def process(self, image_bytes: bytes, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> OCRResult:
+        image = self._decode(image_bytes)
+        elements = await self._process_document(image, deadline)
+        return self._build_result(elements, output_format)
 
+    def _build_result(self, elements: list[dict], output_format: OutputFormat) -> OCRResult:
+        content = self._format_output(elements, output_format)
+        calls, unmerged_calls = self._call_counts(elements)
         print(f"[DolphinEngine] Processed image: {len(elements)} elements, {len(content)} chars")
-        return OCRResult(content=content, format=output_format, metadata={"element_count": len(elements)})
+        return OCRResult(content=content, format=output_format, metadata={"element_count": len(elements), "element_calls": calls, "element_calls_unmerged": unmerged_calls})
+
+    def _call_counts(self, elements: list[dict]) -> tuple[int, int]:
+        calls = {tuple(e.get("merged", [e["reading_order"]])) for e in elements if e["label"] != "fig"}
+        return len(calls), sum(len(c) for c in calls)
 
-    async def _process_document(self, image: Image.Image) -> list[dict]:
-        layout_output = await self.backend.chat(LAYOUT_PROMPT, image)
+    async def _chat(self, prompt: str, image: Image.Image, deadline: Deadline | None, policy: ResolutionPolicy) -> str:
+        if policy.scale_for(image.size) != 1.0:
+            image = await asyncio.to_thread(policy.apply, image)
+        if deadline is None:
+            return await self.backend.chat(prompt, image)
+        return await deadline.wait(self.backend.chat(prompt, image, deadline))
+
+    async def _process_document(self, image: Image.Image, deadline: Deadline | None = None) -> list[dict]:
+        layout_elements = await self._analyze_layout(image, deadline)
+        return await self._process_elements(layout_elements, image, deadline)
+
+    async def _analyze_layout(self, image: Image.Image, deadline: Deadline | None = None) -> list:
+        layout_output = await self._chat(LAYOUT_PROMPT, image, deadline, self.layout_policy)
         layout_elements = parse_layout_string(layout_output)
 
         if not layout_elements or not (layout_output.strip().startswith("[") and layout_output.strip().endswith("]")):
-            layout_elements = [([0, 0, image.size[0], image.size[1]], "distorted_page", [])]
+            layout_elements = [([0, 0, 1000, 1000], "distorted_page", [])]
+
+        return layout_elements
+
+    def _element_box(self, bbox: list[int], label: str, image: Image.Image) -> tuple[int, int, int, int]:
+        if label == "distorted_page":
+            return 0, 0, image.size[0], image.size[1]
+        return process_coordinates(bbox, image)
+
+    async def _process_elements(self, layout_elements: list, image: Image.Image, deadline: Deadline | None = None, region_ids: set[int] | None = None) -> list[dict]:
+        indexed = [(idx, element) for idx, element in enumerate(layout_elements) if region_ids is None or idx in region_ids]
+        if settings.DOLPHIN_MERGE_REGIONS and region_ids is None:
+            groups = merge_regions(indexed, settings.DOLPHIN_MERGE_MAX_HEIGHT, settings.DOLPHIN_MERGE_MAX_GAP, settings.DOLPHIN_MERGE_MAX_REGIONS)
+        else:
+            groups = [[entry] for entry in indexed]
 
-        return await self._process_elements(layout_elements, image)
+        if len(groups) < len(indexed):
+            calls = sum(1 for _, (_, label, _) in indexed if label != "fig")
+            print(f"[DolphinEngine] Merged {len(indexed)} regions into {len(groups)}: element calls {calls} -> {calls - len(indexed) + len(groups)}")
 
-    async def _process_elements(self, layout_elements: list, image: Image.Image) -> list[dict]:
         results = []
 
-        for idx, (bbox, label, tags) in enumerate(layout_elements):
-            if label == "distorted_page":
-                crop = image
-                x1, y1, x2, y2 = 0, 0, image.size[0], image.size[1]
-            else:
-                x1, y1, x2, y2 = process_coordinates(bbox, image)
-                crop = image.crop((x1, y1, x2, y2))
+        for group in groups:
+            if len(group) > 1:
+                results.extend(await self._process_group(group, image, deadline))
+                continue
+
+            idx, (bbox, label, tags) = group[0]
+            x1, y1, x2, y2 = self._element_box(bbox, label, image)
+            crop = image if label == "distorted_page" else image.crop((x1, y1, x2, y2))
 
             if crop.size[0] < 4 or crop.size[1] < 4:
                 continue
@@ -78,20 +132,108 @@ class DolphinEngine(OCREngine):
                 continue
 
             prompt = get_element_prompt(label)
-            text = await self.backend.chat(prompt, crop)
+            text = await self._chat(prompt, crop, deadline, self.element_policy)
 
             results.append({"label": label, "text": text.strip(), "bbox": [x1, y1, x2, y2], "reading_order": idx, "tags": tags})
 
         return results
 
+    async def _process_group(self, group: list, image: Image.Image, deadline: Deadline | None) -> list[dict]:
+        ids = [idx for idx, _ in group]
+        _, (_, label, tags) = group[0]
+        boxes = [self._element_box(bbox, label, image) for _, (bbox, _, _) in group]
+        x1, y1, x2, y2 = union_bbox(boxes)
+
+        text = await self._chat(get_element_prompt(label), image.crop((x1, y1, x2, y2)), deadline, self.element_policy)
+
+        parts = split_merged_text(text, [box[3] - box[1] for box in boxes])
+        if parts is None:
+            return [{"label": label, "text": text.strip(), "bbox": [x1, y1, x2, y2], "reading_order": ids[0], "tags": tags, "merged": ids}]
+        return [{"label": label, "text": part, "bbox": list(box), "reading_order": idx, "tags": tags, "merged": ids} for idx, box, part in zip(ids, boxes, parts)]
+
+    async def analyze_layout(self, image_bytes: bytes, deadline: Deadline | None = None) -> LayoutResult:
+        image = self._decode(image_bytes)
+        layout_elements = await self._analyze_layout(image, deadline)
+        layout_id = self._layout_cache.put(image_bytes, layout_elements)
+
+        regions = []
+        for idx, (bbox, label, tags) in enumerate(layout_elements):
+            regions.append(LayoutRegion(id=idx, label=label, bbox=list(self._element_box(bbox, label, image)), bbox_normalized=bbox, reading_order=idx, tags=tags))
+
+        print(f"[DolphinEngine] Layout analyzed: {len(regions)} regions, layout_id={layout_id}")
+        return LayoutResult(layout_id=layout_id, width=image.size[0], height=image.size[1], regions=regions, expires_in_s=self._layout_cache.ttl)
+
+    async def process_regions(self, layout_id: str, region_ids: list[int], output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> OCRResult:
+        cached = self._layout_cache.get(layout_id)
+        if cached is None:
+            raise LayoutNotFoundError(layout_id)
+
+        unknown = sorted(set(region_ids) - set(range(len(cached.layout_elements))))
+        if unknown:
+            raise OCRException(f"Unknown region ids for layout '{layout_id}': {unknown}", {"layout_id": layout_id, "region_ids": unknown})
+
+        image = await asyncio.to_thread(self._decode, cached.image_bytes)
+        elements = await self._process_elements(cached.layout_elements, image, deadline, set(region_ids))
+        content = self._format_output(elements, output_format)
+
+        print(f"[DolphinEngine] Processed {len(elements)} regions from layout {layout_id}, {len(content)} chars")
+        calls, unmerged_calls = self._call_counts(elements)
+        return OCRResult(content=content, format=output_format, metadata={"element_count": len(elements), "element_calls": calls, "element_calls_unmerged": unmerged_calls, "elements": elements})
+
     def _format_output(self, elements: list[dict], output_format: OutputFormat) -> str:
         return elements_to_markdown(elements)
 
-    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown") -> list[OCRResult | Exception]:
+    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> list[OCRResult | Exception]:
+        if settings.DOLPHIN_PIPELINE_ENABLED:
+            return await self._process_batch_pipelined(images, output_format, deadline)
+        return await self._process_batch_sequential(images, output_format, deadline)
+
+    async def _process_batch_pipelined(self, images: list[bytes], output_format: OutputFormat, deadline: Deadline | None) -> list[OCRResult | Exception]:
+        def check_deadline() -> None:
+            if deadline is not None:
+                deadline.check()
+
+        async def decode(image_bytes: bytes) -> Image.Image:
+            check_deadline()
+            return await asyncio.to_thread(self._decode, image_bytes)
+
+        async def layout(image: Image.Image) -> tuple[Image.Image, list]:
+            check_deadline()
+            return image, await self._analyze_layout(image, deadline)
+
+        async def recognize(payload: tuple[Image.Image, list]) -> OCRResult:
+            check_deadline()
+            image, layout_elements = payload
+            elements = await self._process_elements(layout_elements, image, deadline)
+            return self._build_result(elements, output_format)
+
+        stages = [
+            Stage("decode", decode, settings.DOLPHIN_PIPELINE_DECODE_WORKERS),
+            Stage("layout", layout, settings.DOLPHIN_PIPELINE_LAYOUT_WORKERS),
+            Stage("elements", recognize, settings.DOLPHIN_PIPELINE_ELEMENT_WORKERS),
+        ]
+
+        completed = 0
+
+        def on_item_done(idx: int, result: OCRResult | Exception) -> None:
+            nonlocal completed
+            completed += 1
+            print(f"[DolphinEngine] Batch progress: {completed}/{len(images)} (item {idx})")
+
+        results = await run_pipeline(images, stages, settings.DOLPHIN_PIPELINE_QUEUE_SIZE, on_item_done)
+
+        succeeded = sum(1 for r in results if not isinstance(r, Exception))
+        print(f"[DolphinEngine] Batch complete: {succeeded}/{len(images)} succeeded")
+        return results
+
+    async def _process_batch_sequential(self, images: list[bytes], output_format: OutputFormat, deadline: Deadline | None) -> list[OCRResult | Exception]:
         results = []
         for i, img in enumerate(images):
+            if deadline is not None and deadline.expired:
+                results.append(DeadlineExceededError(deadline.timeout))
+                continue
             try:
-                result = await self.process(img, output_format)
+                result = await self.process(img, output_format, deadline)
                 results.append(result)
             except Exception as e:
                 results.append(e)
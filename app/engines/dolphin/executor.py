@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class InferenceTiming:
+    wait_ms: float
+    compute_ms: float
+
+
+class InferenceExecutor:
+    def __init__(self, slots: int, initializer: Callable[[], None] | None = None, name: str = "inference"):
+        self.slots = slots
+        self._executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix=name, initializer=initializer)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.total_wait_ms = 0.0
+        self.total_compute_ms = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args) -> tuple[Any, InferenceTiming]:
+        submitted = time.perf_counter()
+        timing = InferenceTiming(0.0, 0.0)
+
+        def call():
+            started = time.perf_counter()
+            timing.wait_ms = (started - submitted) * 1000
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                timing.compute_ms = (time.perf_counter() - started) * 1000
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.total_wait_ms += timing.wait_ms
+                    self.total_compute_ms += timing.compute_ms
+
+        with self._lock:
+            self.queued += 1
+        future = self._executor.submit(call)
+        try:
+            return await asyncio.wrap_future(future), timing
+        except asyncio.CancelledError:
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = max(self.completed, 1)
+            return {
+                "slots": self.slots,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "avg_wait_ms": round(self.total_wait_ms / completed, 1),
+                "avg_compute_ms": round(self.total_compute_ms / completed, 1),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,38 @@
+import asyncio
+import json
+from multiprocessing.shared_memory import SharedMemory
+
+from PIL import Image
+
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+def write_image_to_shm(image: Image.Image) -> tuple[SharedMemory, dict]:
+    data = image.tobytes()
+    shm = SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return shm, {"shm": shm.name, "mode": image.mode, "size": list(image.size), "nbytes": len(data)}
+
+
+def read_image_from_shm(name: str, mode: str, size: list[int], nbytes: int) -> Image.Image:
+    shm = SharedMemory(name=name, track=False)
+    try:
+        view = shm.buf[:nbytes]
+        try:
+            return Image.frombytes(mode, tuple(size), bytes(view))
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+async def send_message(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
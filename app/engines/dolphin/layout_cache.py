@@ -0,0 +1,41 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class CachedLayout:
+    image_bytes: bytes
+    layout_elements: list
+    expires_at: float
+
+
+class LayoutCache:
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedLayout] = OrderedDict()
+
+    def put(self, image_bytes: bytes, layout_elements: list) -> str:
+        self._evict_expired()
+        layout_id = uuid.uuid4().hex
+        self._entries[layout_id] = CachedLayout(image_bytes, layout_elements, time.monotonic() + self.ttl)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return layout_id
+
+    def get(self, layout_id: str) -> CachedLayout | None:
+        self._evict_expired()
+        entry = self._entries.get(layout_id)
+        if entry is not None:
+            self._entries.move_to_end(layout_id)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for layout_id in [k for k, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[layout_id]
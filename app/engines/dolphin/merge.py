@@ -0,0 +1,67 @@
+import re
+
+MERGEABLE_LABELS = {"text", "para"}
+MIN_HORIZONTAL_OVERLAP = 0.5
+
+LayoutElement = tuple[list[int], str, list[str]]
+
+
+def union_bbox(boxes: list) -> list[int]:
+    return [min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes)]
+
+
+def _horizontal_overlap(a: list[int], b: list[int]) -> float:
+    narrower = min(a[2] - a[0], b[2] - b[0])
+    if narrower <= 0:
+        return 0.0
+    return (min(a[2], b[2]) - max(a[0], b[0])) / narrower
+
+
+def merge_regions(indexed: list[tuple[int, LayoutElement]], max_height: int, max_gap: int, max_regions: int) -> list[list[tuple[int, LayoutElement]]]:
+    groups: list[list[tuple[int, LayoutElement]]] = []
+
+    for entry in indexed:
+        _, (bbox, label, tags) = entry
+        if groups and label in MERGEABLE_LABELS:
+            group = groups[-1]
+            _, (_, group_label, group_tags) = group[0]
+            group_bbox = union_bbox([element[0] for _, element in group])
+            gap = bbox[1] - group_bbox[3]
+
+            if (
+                label == group_label
+                and tags == group_tags
+                and len(group) < max_regions
+                and -max_gap <= gap <= max_gap
+                and max(group_bbox[3], bbox[3]) - group_bbox[1] <= max_height
+                and _horizontal_overlap(group_bbox, bbox) >= MIN_HORIZONTAL_OVERLAP
+            ):
+                group.append(entry)
+                continue
+
+        groups.append([entry])
+
+    return groups
+
+
+def split_merged_text(text: str, heights: list[int]) -> list[str] | None:
+    blocks = [b.strip() for b in re.split(r"\n\s*\n", text.strip()) if b.strip()]
+    if len(blocks) == len(heights):
+        return blocks
+
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    if len(lines) < len(heights):
+        return None
+
+    heights = [max(h, 1) for h in heights]
+    total = sum(heights)
+    parts = []
+    start = 0
+    cumulative = 0
+    for i, height in enumerate(heights):
+        cumulative += height
+        remaining = len(heights) - i - 1
+        end = len(lines) if remaining == 0 else min(max(round(len(lines) * cumulative / total), start + 1), len(lines) - remaining)
+        parts.append("\n".join(lines[start:end]))
+        start = end
+    return parts
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import os
+
+from app.engines.dolphin.backends.base import DolphinBackend
+from app.engines.dolphin.ipc import MAX_MESSAGE_SIZE, read_image_from_shm, send_message, read_message
+from app.core.config import settings
+from app.core.deadline import Deadline
+
+
+class ModelServer:
+    def __init__(self, socket_path: str, backend: DolphinBackend, model_name: str):
+        self.socket_path = socket_path
+        self.backend = backend
+        self.model_name = model_name
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        await self.backend.initialize()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server = await asyncio.start_unix_server(self._handle_connection, self.socket_path, limit=MAX_MESSAGE_SIZE)
+        print(f"[ModelServer] Serving {self.model_name} on {self.socket_path}")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.backend.cleanup()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            message = await read_message(reader)
+            if message is None:
+                return
+
+            dispatch = asyncio.create_task(self._dispatch(message))
+            disconnect = asyncio.create_task(reader.read(1))
+            done, _ = await asyncio.wait({dispatch, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+
+            if dispatch not in done:
+                dispatch.cancel()
+                print("[ModelServer] Client disconnected, cancelled request")
+                return
+
+            disconnect.cancel()
+            await send_message(writer, dispatch.result())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, message: dict) -> dict:
+        op = message.get("op")
+        try:
+            if op == "ping":
+                executor = getattr(self.backend, "executor", None)
+                return {"ok": await self.backend.health_check(), "model": self.model_name, "device": getattr(self.backend, "device", None), "inference": executor.stats() if executor else None}
+            if op == "chat":
+                image = read_image_from_shm(message["shm"], message["mode"], message["size"], message["nbytes"])
+                deadline = Deadline(message["timeout"]) if message.get("timeout") is not None else None
+                text = await self.backend.chat(message["prompt"], image, deadline)
+                return {"ok": True, "text": text}
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        except Exception as e:
+            print(f"[ModelServer] Request failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the Dolphin model to API workers over a local socket")
+    parser.add_argument("--socket", default=settings.DOLPHIN_SHARED_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--model", default=settings.DOLPHIN_MODEL, help="Model name or path")
+    parser.add_argument("--slots", type=int, default=settings.DOLPHIN_INFERENCE_SLOTS, help="Concurrent generate calls")
+    parser.add_argument("--threads-per-slot", type=int, default=settings.DOLPHIN_TORCH_THREADS_PER_SLOT, help="Torch threads per slot (0 = cores / slots)")
+    args = parser.parse_args()
+
+    from app.engines.dolphin.backends.transformers import TransformersBackend
+
+    server = ModelServer(args.socket, TransformersBackend(args.model, args.slots, args.threads_per_slot), args.model)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("[ModelServer] Shutting down")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+
+
+async def run_pipeline(items: list[Any], stages: list[Stage], queue_size: int, on_item_done: Callable[[int, Any], None] | None = None) -> list[Any]:
+    for stage in stages:
+        if stage.workers < 1:
+            raise ValueError(f"Pipeline stage '{stage.name}' needs at least one worker")
+    results: list[Any] = [None] * len(items)
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+
+    async def feed() -> None:
+        for idx, item in enumerate(items):
+            await queues[0].put((idx, item))
+        for _ in range(stages[0].workers):
+            await queues[0].put(_DONE)
+
+    async def worker(stage_idx: int) -> None:
+        stage = stages[stage_idx]
+        source = queues[stage_idx]
+        sink = queues[stage_idx + 1] if stage_idx + 1 < len(stages) else None
+
+        while (entry := await source.get()) is not _DONE:
+            idx, payload = entry
+            try:
+                output = await stage.handler(payload)
+            except Exception as e:
+                results[idx] = e
+                if on_item_done:
+                    on_item_done(idx, e)
+                continue
+
+            if sink is not None:
+                await sink.put((idx, output))
+            else:
+                results[idx] = output
+                if on_item_done:
+                    on_item_done(idx, output)
+
+    async def run_stage(stage_idx: int) -> None:
+        await asyncio.gather(*(worker(stage_idx) for _ in range(stages[stage_idx].workers)))
+        if stage_idx + 1 < len(stages):
+            for _ in range(stages[stage_idx + 1].workers):
+                await queues[stage_idx + 1].put(_DONE)
+
+    await asyncio.gather(feed(), *(run_stage(i) for i in range(len(stages))))
+    return results
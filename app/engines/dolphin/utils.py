@@ -1,7 +1,8 @@
 import base64
 import io
 import re
-from PIL import Image
+from dataclasses import dataclass
+from PIL import Image, ImageDraw
 
 MAX_IMAGE_SIZE = 1024
 
@@ -16,6 +17,16 @@ def bytes_to_image(image_bytes: bytes) -> Image.Image:
     return Image.open(io.BytesIO(image_bytes)).convert("RGB")
 
 
+def make_synthetic_page(width: int = 800, height: int = 1000) -> Image.Image:
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text((60, 60), "Warmup Document", fill="black", font_size=36)
+    for i in range(12):
+        draw.text((60, 140 + i * 40), f"Line {i + 1}: the quick brown fox jumps over the lazy dog.", fill="black", font_size=20)
+    draw.rectangle((60, 660, width - 60, height - 80), outline="black", width=2)
+    return image
+
+
 def resize_image(image: Image.Image, max_size: int = MAX_IMAGE_SIZE) -> Image.Image:
     width, height = image.size
     if width <= max_size and height <= max_size:
@@ -31,6 +42,26 @@ def resize_image(image: Image.Image, max_size: int = MAX_IMAGE_SIZE) -> Image.Im
     return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
 
+@dataclass(frozen=True)
+class ResolutionPolicy:
+    max_size: int = MAX_IMAGE_SIZE
+    min_size: int = 0
+
+    def scale_for(self, size: tuple[int, int]) -> float:
+        short_side, long_side = min(size), max(size)
+        scale = min(1.0, self.max_size / long_side)
+        if self.min_size and short_side * scale < self.min_size:
+            scale = min(self.min_size / short_side, self.max_size / long_side)
+        return scale
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        scale = self.scale_for(image.size)
+        if scale == 1.0:
+            return image
+        width, height = image.size
+        return image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.Resampling.LANCZOS)
+
+
 def parse_layout_string(layout_str: str) -> list[tuple[list[int], str, list[str]]]:
     if not layout_str or not layout_str.strip().startswith("["):
         return []
@@ -93,5 +124,3 @@ def elements_to_markdown(elements: list[dict]) -> str:
             parts.append(text)
 
     return "\n\n".join(parts)
-
-
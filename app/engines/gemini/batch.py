@@ -0,0 +1,53 @@
+import json
+
+from google.genai import types as genai_types
+
+from app.engines.gemini.prompts import MARKDOWN_PROMPT
+
+TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_PARTIALLY_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+RESULT_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+
+
+def build_batch_jsonl(items: list[tuple[str, str]]) -> bytes:
+    lines = []
+    for key, image_b64 in items:
+        request = {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [
+                        {"inline_data": {"mime_type": "image/png", "data": image_b64}},
+                        {"text": MARKDOWN_PROMPT},
+                    ],
+                }
+            ],
+            "generation_config": {"temperature": 0},
+        }
+        lines.append(json.dumps({"key": key, "request": request}))
+    return "\n".join(lines).encode("utf-8")
+
+
+def parse_batch_results(data: bytes) -> list[tuple[str, str | Exception]]:
+    results = []
+    for i, line in enumerate(data.decode("utf-8").splitlines()):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        key = entry.get("key", str(i))
+        if entry.get("error"):
+            results.append((key, RuntimeError(f"Gemini batch item error: {entry['error']}")))
+            continue
+        response = genai_types.GenerateContentResponse.model_validate(entry.get("response", {}))
+        results.append((key, (response.text or "").strip()))
+    return results
+
+
+def job_state(job: genai_types.BatchJob) -> str:
+    state = job.state
+    return getattr(state, "value", None) or str(state)
@@ -1,13 +1,19 @@
 import asyncio
+import time
+from collections import OrderedDict
 
 from google.genai import types as genai_types
 
-from app.engines.base import OCREngine, OCRResult, OutputFormat
+from app.engines.base import OCREngine, OCRResult, OutputFormat, BatchJobStatus
 from app.engines.registry import EngineRegistry
+from app.engines.gemini.batch import TERMINAL_STATES, RESULT_STATES, build_batch_jsonl, parse_batch_results, job_state
 from app.engines.gemini.prompts import MARKDOWN_PROMPT
 from app.core.config import settings
 from app.core.ai_service import ai_service
-from app.core.exceptions import OCRException
+from app.core.deadline import Deadline
+from app.core.exceptions import OCRException, DeadlineExceededError
+
+FINISHED_JOB_CACHE_SIZE = 8
 
 
 @EngineRegistry.register("gemini")
@@ -18,6 +24,7 @@ class GeminiEngine(OCREngine):
     def __init__(self):
         self._initialized = False
         self._semaphore: asyncio.Semaphore | None = None
+        self._finished_jobs: OrderedDict[str, BatchJobStatus] = OrderedDict()
 
     async def initialize(self) -> None:
         if not settings.GOOGLE_API_KEY:
@@ -30,11 +37,16 @@ class GeminiEngine(OCREngine):
     async def health_check(self) -> bool:
         return self._initialized and ai_service.client is not None
 
+    async def warmup(self) -> None:
+        if ai_service.client is None:
+            raise OCRException("Gemini client could not be created")
+
     async def cleanup(self) -> None:
         self._initialized = False
         self._semaphore = None
+        self._finished_jobs.clear()
 
-    async def process(self, image_bytes: bytes, output_format: OutputFormat = "markdown") -> OCRResult:
+    async def process(self, image_bytes: bytes, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> OCRResult:
         if not self._initialized:
             raise OCRException("Engine not initialized")
 
@@ -46,25 +58,81 @@ class GeminiEngine(OCREngine):
         config = genai_types.GenerateContentConfig(temperature=0)
 
         try:
-            response = await ai_service.generate_content(settings.GEMINI_MODEL, contents, config)
+            call = ai_service.generate_content(settings.GEMINI_MODEL, contents, config)
+            response = await (deadline.wait(call) if deadline else call)
             content = response.text or ""
+        except DeadlineExceededError:
+            raise
         except Exception as e:
             raise OCRException(f"Gemini API error: {e}")
 
         print(f"[GeminiEngine] Processed image: {len(content)} chars extracted")
         return OCRResult(content=content.strip(), format=output_format, metadata={"model": settings.GEMINI_MODEL})
 
-    async def _process_with_semaphore(self, image_bytes: bytes, output_format: OutputFormat) -> OCRResult:
+    async def _process_with_semaphore(self, image_bytes: bytes, output_format: OutputFormat, deadline: Deadline | None) -> OCRResult:
         async with self._semaphore:
-            return await self.process(image_bytes, output_format)
+            return await self.process(image_bytes, output_format, deadline)
 
-    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown") -> list[OCRResult | Exception]:
+    async def process_batch(self, images: list[bytes], output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> list[OCRResult | Exception]:
         if not self._initialized:
             raise OCRException("Engine not initialized")
 
-        tasks = [self._process_with_semaphore(img, output_format) for img in images]
+        tasks = [self._process_with_semaphore(img, output_format, deadline) for img in images]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         succeeded = sum(1 for r in results if not isinstance(r, Exception))
         print(f"[GeminiEngine] Batch complete: {succeeded}/{len(images)} succeeded")
         return list(results)
+
+    async def submit_batch_job(self, items: list[tuple[str, str]], output_format: OutputFormat = "markdown") -> BatchJobStatus:
+        if not self._initialized:
+            raise OCRException("Engine not initialized")
+
+        display_name = f"ocr-batch-{int(time.time())}"
+        payload = await asyncio.to_thread(build_batch_jsonl, items)
+
+        try:
+            uploaded = await ai_service.upload_file(payload, "jsonl", display_name)
+            job = await ai_service.create_batch_job(settings.GEMINI_MODEL, uploaded.name, display_name)
+        except Exception as e:
+            raise OCRException(f"Gemini batch submission failed: {e}")
+
+        print(f"[GeminiEngine] Submitted batch job {job.name}: {len(items)} items, {len(payload)} bytes")
+        return BatchJobStatus(job_id=job.name, state=job_state(job), done=False)
+
+    async def get_batch_job(self, job_id: str, output_format: OutputFormat = "markdown") -> BatchJobStatus:
+        if not self._initialized:
+            raise OCRException("Engine not initialized")
+
+        if job_id in self._finished_jobs:
+            self._finished_jobs.move_to_end(job_id)
+            return self._finished_jobs[job_id]
+
+        try:
+            job = await ai_service.get_batch_job(job_id)
+        except Exception as e:
+            raise OCRException(f"Gemini batch lookup failed: {e}")
+
+        state = job_state(job)
+        if state not in TERMINAL_STATES:
+            return BatchJobStatus(job_id=job_id, state=state, done=False)
+        if state not in RESULT_STATES or not (job.dest and job.dest.file_name):
+            return BatchJobStatus(job_id=job_id, state=state, done=True, results=[])
+
+        data = await ai_service.download_file(job.dest.file_name)
+        parsed = await asyncio.to_thread(parse_batch_results, data)
+
+        results = []
+        for key, value in parsed:
+            if isinstance(value, Exception):
+                results.append((key, value))
+            else:
+                results.append((key, OCRResult(content=value, format=output_format, metadata={"model": settings.GEMINI_MODEL, "batch_job": job_id})))
+
+        succeeded = sum(1 for _, r in results if not isinstance(r, Exception))
+        print(f"[GeminiEngine] Batch job {job_id} {state}: {succeeded}/{len(results)} succeeded")
+        status = BatchJobStatus(job_id=job_id, state=state, done=True, results=results)
+        self._finished_jobs[job_id] = status
+        while len(self._finished_jobs) > FINISHED_JOB_CACHE_SIZE:
+            self._finished_jobs.popitem(last=False)
+        return status
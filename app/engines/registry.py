@@ -1,3 +1,6 @@
+import asyncio
+import importlib
+import time
 from typing import TYPE_CHECKING
 
 from app.core.exceptions import EngineNotFoundError
@@ -9,6 +12,11 @@ if TYPE_CHECKING:
 class EngineRegistry:
     _engines: dict[str, type["OCREngine"]] = {}
     _instances: dict[str, "OCREngine"] = {}
+    _ready: set[str] = set()
+    _modules: dict[str, str] = {
+        "dolphin": "app.engines.dolphin.engine",
+        "gemini": "app.engines.gemini.engine",
+    }
 
     @classmethod
     def register(cls, name: str):
@@ -17,8 +25,21 @@ class EngineRegistry:
             return engine_cls
         return decorator
 
+    @classmethod
+    def _import_engine(cls, name: str) -> None:
+        module_path = cls._modules.get(name)
+        if module_path is None:
+            raise EngineNotFoundError(name)
+
+        start = time.perf_counter()
+        importlib.import_module(module_path)
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        print(f"[EngineRegistry] Imported {module_path} in {elapsed_ms}ms")
+
     @classmethod
     def get_class(cls, name: str) -> type["OCREngine"]:
+        if name not in cls._engines:
+            cls._import_engine(name)
         if name not in cls._engines:
             raise EngineNotFoundError(name)
         return cls._engines[name]
@@ -37,16 +58,44 @@ class EngineRegistry:
         cls._instances[name] = engine
         return engine
 
+    @classmethod
+    async def warmup_engine(cls, name: str, retry_interval: float = 10.0) -> None:
+        engine = cls.get_instance(name)
+        attempt = 1
+        while True:
+            start = time.perf_counter()
+            try:
+                await engine.warmup()
+                break
+            except Exception as e:
+                print(f"[EngineRegistry] Warmup attempt {attempt} failed for {name}: {e}, retrying in {retry_interval:g}s")
+                attempt += 1
+                await asyncio.sleep(retry_interval)
+
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+        print(f"[EngineRegistry] Warmup complete for {name} in {elapsed_ms}ms")
+        cls.mark_ready(name)
+
+    @classmethod
+    def mark_ready(cls, name: str) -> None:
+        if name in cls._instances:
+            cls._ready.add(name)
+
     @classmethod
     async def cleanup_all(cls) -> None:
         for engine in cls._instances.values():
             await engine.cleanup()
         cls._instances.clear()
+        cls._ready.clear()
 
     @classmethod
     def list_engines(cls) -> list[str]:
-        return list(cls._engines.keys())
+        return list(dict.fromkeys([*cls._modules, *cls._engines]))
 
     @classmethod
     def list_initialized(cls) -> list[str]:
         return list(cls._instances.keys())
+
+    @classmethod
+    def list_ready(cls) -> list[str]:
+        return [name for name in cls._instances if name in cls._ready]
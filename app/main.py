@@ -1,3 +1,5 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -6,19 +8,29 @@ from fastapi.responses import JSONResponse
 
 from app.api.v1.routes import router
 from app.core.config import settings
-from app.core.exceptions import OCRException
+from app.core.exceptions import OCRException, OverloadedError
 from app.engines.registry import EngineRegistry
 
-import app.engines.dolphin.engine  # noqa: F401
-import app.engines.gemini.engine  # noqa: F401
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print(f"[Startup] Initializing engine: {settings.DEFAULT_ENGINE}")
+    start = time.perf_counter()
     await EngineRegistry.initialize_engine(settings.DEFAULT_ENGINE)
-    print(f"[Startup] Engine ready: {settings.DEFAULT_ENGINE}")
+    elapsed_ms = int((time.perf_counter() - start) * 1000)
+    print(f"[Startup] Engine initialized: {settings.DEFAULT_ENGINE} in {elapsed_ms}ms")
+
+    warmup_task = None
+    if settings.WARMUP_ON_STARTUP:
+        print(f"[Startup] Warming up engine: {settings.DEFAULT_ENGINE}")
+        warmup_task = asyncio.create_task(EngineRegistry.warmup_engine(settings.DEFAULT_ENGINE, settings.WARMUP_RETRY_INTERVAL))
+    else:
+        EngineRegistry.mark_ready(settings.DEFAULT_ENGINE)
+
     yield
+
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
     print("[Shutdown] Cleaning up engines...")
     await EngineRegistry.cleanup_all()
 
@@ -41,7 +53,16 @@ app.add_middleware(
 
 @app.exception_handler(OCRException)
 async def ocr_exception_handler(request: Request, exc: OCRException):
-    return JSONResponse(status_code=400, content={"detail": exc.message, "error_type": type(exc).__name__})
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message, "error_type": type(exc).__name__})
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_exception_handler(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.message, "error_type": type(exc).__name__},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 app.include_router(router)
@@ -1,9 +1,11 @@
+import asyncio
 import base64
 import time
 
-from app.engines.base import OCRResult, OutputFormat
+from app.engines.base import OCRResult, OutputFormat, LayoutResult, BatchJobStatus
 from app.engines.registry import EngineRegistry
 from app.core.config import settings
+from app.core.deadline import Deadline
 from app.core.exceptions import UnsupportedFormatError, ImageProcessingError
 
 
@@ -25,31 +27,95 @@ class OCRService:
         except Exception as e:
             raise ImageProcessingError(f"Invalid base64 image: {e}")
 
-    async def process_image(self, image_b64: str, engine_name: str | None = None, output_format: OutputFormat = "markdown") -> tuple[OCRResult, str, int]:
+    async def process_image(self, image_b64: str, engine_name: str | None = None, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> tuple[OCRResult, str, int]:
+        return await self.process_image_bytes(self._decode_image(image_b64), engine_name, output_format, deadline)
+
+    async def process_image_bytes(self, image_bytes: bytes, engine_name: str | None = None, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> tuple[OCRResult, str, int]:
         engine = self._get_engine(engine_name)
         self._validate_format(engine, output_format)
 
-        image_bytes = self._decode_image(image_b64)
+        deadline = deadline or Deadline(settings.REQUEST_TIMEOUT)
 
         start = time.perf_counter()
-        result = await engine.process(image_bytes, output_format)
+        try:
+            result = await engine.process(image_bytes, output_format, deadline)
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
         elapsed_ms = int((time.perf_counter() - start) * 1000)
 
         return result, engine.name, elapsed_ms
 
-    async def process_batch(self, images_b64: list[str], engine_name: str | None = None, output_format: OutputFormat = "markdown") -> tuple[list[OCRResult | Exception], str, int]:
-        engine = self._get_engine(engine_name)
-        self._validate_format(engine, output_format)
-
+    async def process_batch(self, images_b64: list[str], engine_name: str | None = None, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> tuple[list[OCRResult | Exception], str, int]:
         images_bytes = []
         for img_b64 in images_b64:
             images_bytes.append(self._decode_image(img_b64))
 
+        return await self.process_batch_bytes(images_bytes, engine_name, output_format, deadline)
+
+    async def process_batch_bytes(self, images_bytes: list[bytes], engine_name: str | None = None, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> tuple[list[OCRResult | Exception], str, int]:
+        engine = self._get_engine(engine_name)
+        self._validate_format(engine, output_format)
+
+        deadline = deadline or Deadline(settings.REQUEST_TIMEOUT)
+
         start = time.perf_counter()
-        results = await engine.process_batch(images_bytes, output_format)
+        try:
+            results = await engine.process_batch(images_bytes, output_format, deadline)
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
         elapsed_ms = int((time.perf_counter() - start) * 1000)
 
         return results, engine.name, elapsed_ms
 
+    async def analyze_layout(self, image_b64: str, engine_name: str | None = None, deadline: Deadline | None = None) -> tuple[LayoutResult, str, int]:
+        engine = self._get_engine(engine_name)
+        image_bytes = self._decode_image(image_b64)
+        deadline = deadline or Deadline(settings.REQUEST_TIMEOUT)
+
+        start = time.perf_counter()
+        try:
+            layout = await engine.analyze_layout(image_bytes, deadline)
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+        return layout, engine.name, elapsed_ms
+
+    async def process_regions(self, layout_id: str, region_ids: list[int], engine_name: str | None = None, output_format: OutputFormat = "markdown", deadline: Deadline | None = None) -> tuple[OCRResult, str, int]:
+        engine = self._get_engine(engine_name)
+        self._validate_format(engine, output_format)
+        deadline = deadline or Deadline(settings.REQUEST_TIMEOUT)
+
+        start = time.perf_counter()
+        try:
+            result = await engine.process_regions(layout_id, region_ids, output_format, deadline)
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+        return result, engine.name, elapsed_ms
+
+    async def submit_batch_job(self, items: list[tuple[str, str]], engine_name: str | None = None, output_format: OutputFormat = "markdown") -> tuple[BatchJobStatus, str]:
+        engine = self._get_engine(engine_name)
+        self._validate_format(engine, output_format)
+        return await engine.submit_batch_job(items, output_format), engine.name
+
+    async def get_batch_job(self, job_id: str, engine_name: str | None = None, output_format: OutputFormat = "markdown") -> tuple[BatchJobStatus, str]:
+        engine = self._get_engine(engine_name)
+        return await engine.get_batch_job(job_id, output_format), engine.name
+
+    async def wait_for_batch_job(self, job_id: str, engine_name: str | None = None, output_format: OutputFormat = "markdown", poll_interval: float | None = None) -> tuple[BatchJobStatus, str]:
+        poll_interval = poll_interval or settings.GEMINI_BATCH_POLL_INTERVAL
+        while True:
+            status, name = await self.get_batch_job(job_id, engine_name, output_format)
+            if status.done:
+                return status, name
+            print(f"[OCRService] Batch job {job_id} is {status.state}, polling again in {poll_interval}s")
+            await asyncio.sleep(poll_interval)
+
 
 ocr_service = OCRService()
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import base64
+import dataclasses
+import io
+import json
+import os
+
+import httpx
+
+from loadtest.fakes import LatencyProfile, FakeGenAIClient, start_fake_vllm
+from loadtest.runner import ENDPOINTS, LoadConfig, run_load, summarize, format_report
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', expected one of {list(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_image(path: str | None) -> str:
+    if path:
+        with open(path, "rb") as f:
+            return base64.b64encode(f.read()).decode("utf-8")
+
+    from app.engines.dolphin.utils import make_synthetic_page
+
+    buffer = io.BytesIO()
+    make_synthetic_page().save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        response = await client.get("/api/v1/ready")
+        if response.status_code == 200:
+            return
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Service did not become ready")
+
+
+async def run_in_process(args, config: LoadConfig, profile: LatencyProfile, image_b64: str):
+    os.environ["OCR_DEFAULT_ENGINE"] = args.engine
+    if args.engine == "dolphin":
+        os.environ["OCR_DOLPHIN_BACKEND"] = "vllm"
+        os.environ["OCR_DOLPHIN_VLLM_URL"] = args.fake_vllm_url or start_fake_vllm(profile, args.fake_vllm_port, args.elements)
+    else:
+        os.environ.setdefault("OCR_GOOGLE_API_KEY", "loadtest")
+
+    from app.main import app
+    from app.core.ai_service import ai_service
+
+    if args.engine == "gemini":
+        ai_service.client = FakeGenAIClient(profile)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            await wait_ready(client)
+            return await run_load(client, config, image_b64)
+
+
+async def run_remote(args, config: LoadConfig, image_b64: str):
+    async with httpx.AsyncClient(base_url=args.url, limits=httpx.Limits(max_connections=None)) as client:
+        await wait_ready(client)
+        return await run_load(client, config, image_b64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the OCR service")
+    parser.add_argument("--engine", choices=["dolphin", "gemini"], default="dolphin")
+    parser.add_argument("--rate", type=float, default=2.0, help="Target arrival rate in requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate arrivals for")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("ocr=1,batch=1,jsonl=1"), help="Endpoint weights, e.g. ocr=3,batch=1")
+    parser.add_argument("--batch-size", type=int, default=4, help="Images per batch/jsonl request")
+    parser.add_argument("--image", help="Image to send (defaults to a synthetic page)")
+    parser.add_argument("--url", help="Drive a running service instead of an in-process app")
+    parser.add_argument("--api-key", help="X-API-Key header to send")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+
+    fakes = parser.add_argument_group("fake backends (in-process mode)")
+    fakes.add_argument("--latency-ms", type=float, default=200.0, help="Median fake backend latency per call")
+    fakes.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma of fake latency")
+    fakes.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake calls that fail with 500")
+    fakes.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of fake calls that return 429")
+    fakes.add_argument("--elements", type=int, default=4, help="Layout elements per page from fake vLLM")
+    fakes.add_argument("--fake-vllm-port", type=int, default=8001)
+    fakes.add_argument("--fake-vllm-url", help="Use an already running fake vLLM (python -m loadtest.fakes)")
+    args = parser.parse_args()
+
+    config = LoadConfig(engine=args.engine, rate=args.rate, duration=args.duration, mix=args.mix, batch_size=args.batch_size, api_key=args.api_key, seed=args.seed)
+    profile = LatencyProfile(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate, args.seed)
+    image_b64 = load_image(args.image)
+
+    if args.url:
+        samples, elapsed = asyncio.run(run_remote(args, config, image_b64))
+    else:
+        samples, elapsed = asyncio.run(run_in_process(args, config, profile, image_b64))
+
+    reports = summarize(samples, elapsed)
+    print(format_report(reports, elapsed, len(samples) / args.duration))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"elapsed_s": elapsed, "config": dataclasses.asdict(config), "endpoints": [dataclasses.asdict(r) for r in reports]}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
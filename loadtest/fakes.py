@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LAYOUT_HINT = "reading order"
+
+
+@dataclass
+class LatencyProfile:
+    median_ms: float = 200.0
+    sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int | None = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def sample_seconds(self) -> float:
+        return self._rng.lognormvariate(0, self.sigma) * self.median_ms / 1000
+
+    def sample_outcome(self) -> str:
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+def fake_layout(element_count: int) -> str:
+    parts = []
+    step = 900 // max(element_count, 1)
+    for i in range(element_count):
+        y1 = 50 + i * step
+        label = "title" if i == 0 else "para"
+        parts.append(f"[50, {y1}, 950, {y1 + step - 10}], {label}")
+    return "[" + "][".join(parts) + "]"
+
+
+def fake_text(rng: random.Random, words: int = 60) -> str:
+    vocab = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do", "eiusmod", "tempor"]
+    return " ".join(rng.choice(vocab) for _ in range(words))
+
+
+def create_fake_vllm_app(profile: LatencyProfile, model_name: str = "ByteDance/Dolphin-v2", element_count: int = 4) -> FastAPI:
+    app = FastAPI(title="Fake vLLM")
+    rng = random.Random(profile.seed)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": model_name, "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        await asyncio.sleep(profile.sample_seconds())
+
+        outcome = profile.sample_outcome()
+        if outcome == "rate_limited":
+            return JSONResponse(status_code=429, content={"error": {"message": "Too many requests"}}, headers={"Retry-After": "1"})
+        if outcome == "error":
+            return JSONResponse(status_code=500, content={"error": {"message": "Internal error"}})
+
+        prompt = next((part["text"] for part in payload["messages"][0]["content"] if part.get("type") == "text"), "")
+        content = fake_layout(element_count) if LAYOUT_HINT in prompt else fake_text(rng)
+        return {
+            "id": f"chatcmpl-{rng.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "model": payload.get("model", model_name),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        }
+
+    return app
+
+
+def start_fake_vllm(profile: LatencyProfile, port: int, element_count: int = 4) -> str:
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_fake_vllm_app(profile, element_count=element_count), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    print(f"[FakeVLLM] Listening on http://127.0.0.1:{port}/v1")
+    return f"http://127.0.0.1:{port}/v1"
+
+
+class _FakeModels:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+
+    async def generate_content(self, model: str, contents, config=None):
+        from google.genai import errors as genai_errors
+
+        await asyncio.sleep(self.profile.sample_seconds())
+
+        outcome = self.profile.sample_outcome()
+        if outcome == "rate_limited":
+            raise genai_errors.ClientError(429, {"error": {"code": 429, "message": "Resource exhausted", "status": "RESOURCE_EXHAUSTED"}})
+        if outcome == "error":
+            raise genai_errors.ServerError(500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}})
+
+        return SimpleNamespace(text=f"# Page\n\n{fake_text(self._rng)}")
+
+
+class _FakeFiles:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+
+    async def upload(self, file, config=None):
+        from google.genai import types as genai_types
+
+        name = f"files/fake-{len(self.store)}"
+        self.store[name] = file.read()
+        return genai_types.File(name=name, display_name=getattr(config, "display_name", None))
+
+    async def download(self, file, config=None) -> bytes:
+        return self.store[file]
+
+
+class _FakeBatches:
+    def __init__(self, profile: LatencyProfile, files: _FakeFiles):
+        self.profile = profile
+        self.files = files
+        self.jobs: dict[str, tuple[str, float]] = {}
+        self._rng = random.Random(profile.seed)
+
+    async def create(self, model: str, src: str, config=None):
+        name = f"batches/fake-{len(self.jobs)}"
+        self.jobs[name] = (src, time.monotonic() + self.profile.sample_seconds())
+        return self._job(name, "JOB_STATE_PENDING")
+
+    async def get(self, name: str, config=None):
+        src, ready_at = self.jobs[name]
+        if time.monotonic() < ready_at:
+            return self._job(name, "JOB_STATE_RUNNING")
+
+        output_name = f"{src}-output"
+        if output_name not in self.files.store:
+            self.files.store[output_name] = self._run(self.files.store[src])
+        return self._job(name, "JOB_STATE_SUCCEEDED", output_name)
+
+    def _run(self, data: bytes) -> bytes:
+        lines = []
+        for line in data.decode("utf-8").splitlines():
+            key = json.loads(line)["key"]
+            if self.profile.sample_outcome() == "ok":
+                response = {"candidates": [{"content": {"role": "model", "parts": [{"text": f"# Page\n\n{fake_text(self._rng)}"}]}}]}
+                lines.append(json.dumps({"key": key, "response": response}))
+            else:
+                lines.append(json.dumps({"key": key, "error": {"code": 500, "message": "Internal error"}}))
+        return "\n".join(lines).encode("utf-8")
+
+    def _job(self, name: str, state: str, output_name: str | None = None):
+        from google.genai import types as genai_types
+
+        dest = genai_types.BatchJobDestination(file_name=output_name) if output_name else None
+        return genai_types.BatchJob(name=name, state=genai_types.JobState(state), dest=dest)
+
+
+class FakeGenAIClient:
+    def __init__(self, profile: LatencyProfile):
+        files = _FakeFiles()
+        self.aio = SimpleNamespace(models=_FakeModels(profile), files=files, batches=_FakeBatches(profile, files))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible vLLM server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Median latency per call")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma of the latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--elements", type=int, default=4, help="Layout elements returned per page")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    profile = LatencyProfile(args.latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate, args.seed)
+    uvicorn.run(create_fake_vllm_app(profile, element_count=args.elements), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
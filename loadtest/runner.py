@@ -0,0 +1,143 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+ENDPOINTS = {"ocr": "/api/v1/ocr", "batch": "/api/v1/ocr/batch", "jsonl": "/api/v1/ocr/batch/jsonl"}
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    engine: str
+    status: int | str
+    latency_ms: float
+    pages: int
+    item_errors: int = 0
+
+
+@dataclass
+class LoadConfig:
+    engine: str
+    rate: float
+    duration: float
+    mix: dict[str, float]
+    batch_size: int = 4
+    api_key: str | None = None
+    timeout: float = 600.0
+    seed: int | None = None
+
+
+@dataclass
+class EndpointReport:
+    endpoint: str
+    engine: str
+    requests: int = 0
+    succeeded: int = 0
+    pages: int = 0
+    item_errors: int = 0
+    throughput_rps: float = 0.0
+    pages_per_s: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    errors: dict[str, int] = field(default_factory=dict)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def build_request(endpoint: str, config: LoadConfig, image_b64: str) -> dict:
+    if endpoint == "ocr":
+        return {"json": {"image": image_b64, "engine": config.engine}}
+    if endpoint == "batch":
+        return {"json": {"images": [image_b64] * config.batch_size, "engine": config.engine}}
+    lines = "\n".join(json.dumps({"image": image_b64, "id": f"page_{i:03d}"}) for i in range(config.batch_size))
+    return {"files": {"file": ("batch.jsonl", lines.encode("utf-8"), "application/jsonl")}, "data": {"engine": config.engine}}
+
+
+async def _send(client: httpx.AsyncClient, endpoint: str, config: LoadConfig, image_b64: str) -> Sample:
+    pages = 1 if endpoint == "ocr" else config.batch_size
+    headers = {"X-API-Key": config.api_key} if config.api_key else {}
+    start = time.perf_counter()
+    try:
+        response = await client.post(ENDPOINTS[endpoint], headers=headers, timeout=config.timeout, **build_request(endpoint, config, image_b64))
+        latency_ms = (time.perf_counter() - start) * 1000
+    except httpx.HTTPError as e:
+        return Sample(endpoint, config.engine, type(e).__name__, (time.perf_counter() - start) * 1000, pages)
+
+    item_errors = 0
+    if response.status_code == 200 and endpoint != "ocr":
+        item_errors = sum(1 for item in response.json()["results"] if not item["success"])
+    return Sample(endpoint, config.engine, response.status_code, latency_ms, pages, item_errors)
+
+
+async def run_load(client: httpx.AsyncClient, config: LoadConfig, image_b64: str) -> tuple[list[Sample], float]:
+    rng = random.Random(config.seed)
+    endpoints = list(config.mix)
+    weights = [config.mix[e] for e in endpoints]
+
+    tasks: list[asyncio.Task] = []
+    start = time.perf_counter()
+    next_arrival = 0.0
+    while next_arrival < config.duration:
+        delay = start + next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint = rng.choices(endpoints, weights)[0]
+        tasks.append(asyncio.create_task(_send(client, endpoint, config, image_b64)))
+        next_arrival += rng.expovariate(config.rate)
+
+    samples = await asyncio.gather(*tasks)
+    return list(samples), time.perf_counter() - start
+
+
+def summarize(samples: list[Sample], elapsed: float) -> list[EndpointReport]:
+    grouped: dict[tuple[str, str], list[Sample]] = defaultdict(list)
+    for sample in samples:
+        grouped[(sample.endpoint, sample.engine)].append(sample)
+
+    reports = []
+    for (endpoint, engine), group in sorted(grouped.items()):
+        ok = [s for s in group if s.status == 200]
+        latencies = [s.latency_ms for s in ok]
+        errors = Counter(str(s.status) for s in group if s.status != 200)
+        item_errors = sum(s.item_errors for s in ok)
+        if item_errors:
+            errors["item_errors"] = item_errors
+        reports.append(EndpointReport(
+            endpoint=endpoint,
+            engine=engine,
+            requests=len(group),
+            succeeded=len(ok),
+            pages=sum(s.pages for s in ok),
+            item_errors=item_errors,
+            throughput_rps=round(len(ok) / elapsed, 2),
+            pages_per_s=round(sum(s.pages for s in ok) / elapsed, 2),
+            p50_ms=round(percentile(latencies, 50), 1),
+            p95_ms=round(percentile(latencies, 95), 1),
+            p99_ms=round(percentile(latencies, 99), 1),
+            errors=dict(errors),
+        ))
+    return reports
+
+
+def format_report(reports: list[EndpointReport], elapsed: float, offered_rate: float) -> str:
+    lines = [
+        f"Load test: {elapsed:.1f}s, offered rate {offered_rate:.2f} req/s",
+        f"{'endpoint':<8} {'engine':<8} {'reqs':>6} {'ok':>6} {'req/s':>7} {'pages/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  errors",
+    ]
+    for r in reports:
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(r.errors.items())) or "-"
+        lines.append(f"{r.endpoint:<8} {r.engine:<8} {r.requests:>6} {r.succeeded:>6} {r.throughput_rps:>7} {r.pages_per_s:>8} {r.p50_ms:>9} {r.p95_ms:>9} {r.p99_ms:>9}  {errors}")
+    return "\n".join(lines)